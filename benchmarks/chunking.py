@@ -0,0 +1,83 @@
+"""
+Compares the header-only splitter with the token-bounded chunker on
+ingestion throughput (chunk + embed), rerank latency over the retriever's
+candidate set, and the size of the context handed to the LLM.
+
+Usage: python -m benchmarks.chunking [markdown_file] [query]
+"""
+
+import random
+import statistics
+import sys
+import time
+
+from pdf_chatbot import config
+from pdf_chatbot.documents import chunker
+from pdf_chatbot.rag.embeddings import embedding_engine
+from pdf_chatbot.rag.reranker import reranker
+
+RERANK_TRIALS = 20
+CONTEXT_CHUNKS = 3
+
+
+def _synthetic_markdown() -> str:
+    rng = random.Random(0)
+    words = "retrieval document section table revenue policy model latency index chunk".split()
+    sections = []
+    for i in range(20):
+        # Few headers and long bodies, the case the header-only splitter handles poorly
+        body = " ".join(rng.choice(words) for _ in range(rng.randint(200, 3000)))
+        sections.append(f"# Section {i}\n{body}" if i % 4 == 0 else body)
+    return "\n\n".join(sections)
+
+
+def _benchmark_mode(mode: str, markdown: str, query: str) -> dict:
+    config.CHUNKING_MODE = mode
+    tokenizer = chunker._get_tokenizer()
+
+    start = time.perf_counter()
+    chunks, _ = chunker.chunk_markdown(markdown)
+    chunk_seconds = time.perf_counter() - start
+
+    texts = [chunk.page_content for chunk in chunks]
+    start = time.perf_counter()
+    embedding_engine.embed_documents(texts)
+    embed_seconds = time.perf_counter() - start
+
+    rng = random.Random(0)
+    candidates = rng.sample(texts, min(config.VECTOR_RETRIEVER_MAX_DOCS, len(texts)))
+    rerank_latencies = []
+    for _ in range(RERANK_TRIALS):
+        start = time.perf_counter()
+        reranker.model.predict([(query, text) for text in candidates])
+        rerank_latencies.append(time.perf_counter() - start)
+
+    token_lengths = [len(tokenizer.tokenize(text)) for text in texts]
+    context_tokens = sum(sorted(token_lengths, reverse=True)[:CONTEXT_CHUNKS])
+    return {
+        "chunks": len(chunks),
+        "max_chunk_tokens": max(token_lengths),
+        "ingest_chunks_per_s": len(chunks) / (chunk_seconds + embed_seconds),
+        "ingest_seconds": chunk_seconds + embed_seconds,
+        "rerank_p50_ms": statistics.median(rerank_latencies) * 1000,
+        "worst_case_context_tokens": context_tokens,
+    }
+
+
+def main():
+    markdown = open(sys.argv[1]).read() if len(sys.argv) > 1 else _synthetic_markdown()
+    query = sys.argv[2] if len(sys.argv) > 2 else "What does the policy say about latency?"
+
+    # Warm up models so load time is excluded
+    embedding_engine.embed_documents(["warmup"])
+    reranker.model.predict([(query, "warmup")])
+
+    for mode in [chunker.CHUNKING_MODE_HEADERS, chunker.CHUNKING_MODE_TOKEN_BOUNDED]:
+        results = _benchmark_mode(mode, markdown, query)
+        print(mode)
+        for key, value in results.items():
+            print(f"  {key:28}: {value:.2f}" if isinstance(value, float) else f"  {key:28}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Per-request RAG agent overhead: building and compiling the LangGraph graph
+on every request (the previous behaviour, including the draw_ascii render
+when grandalf is installed) vs. looking up the graph compiled once per
+feature variant.
+
+Usage: python -m benchmarks.rag_agent_overhead [requests]
+"""
+
+import sys
+import time
+
+from pdf_chatbot.rag.rag_agent import RAGAgent, rag_agent
+from pdf_chatbot.schemas.agent import AgentConfig
+
+
+def _compile_per_request(agent_config: AgentConfig):
+    app = RAGAgent()._compile_graph(*rag_agent._variant(agent_config))
+    try:
+        app.get_graph().draw_ascii()
+    except ImportError:
+        pass  # grandalf not installed; the render is skipped
+    return app
+
+
+def _run(get_app, configs: list[AgentConfig]) -> float:
+    start = time.perf_counter()
+    for agent_config in configs:
+        get_app(agent_config)
+    return time.perf_counter() - start
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    configs = [
+        AgentConfig(query_enrichment_enabled=i % 2 == 0) for i in range(requests)
+    ]
+
+    per_request = _run(_compile_per_request, configs)
+    # Compiles each variant once, as the first requests after startup do
+    _run(rag_agent.get_app, configs[:2])
+    compiled_once = _run(rag_agent.get_app, configs)
+
+    print(f"requests={requests}")
+    print(f"compile per request : {per_request / requests * 1e6:,.0f} us/request")
+    print(f"compiled once       : {compiled_once / requests * 1e6:,.2f} us/request")
+    print(f"speedup             : {per_request / compiled_once:,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
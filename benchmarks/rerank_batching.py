@@ -0,0 +1,57 @@
+"""
+Throughput of per-request CrossEncoder.predict calls vs. the shared
+BatchedReranker under concurrent load.
+
+Usage: python -m benchmarks.rerank_batching [concurrency] [requests] [pairs_per_request]
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import sys
+import time
+
+from pdf_chatbot.rag.reranker import BatchedReranker
+
+PASSAGE = (
+    "Hybrid retrieval combines dense similarity search with keyword search, "
+    "and the retrieved candidates are reranked using a cross-encoder. "
+)
+
+
+def _make_requests(total_requests: int, pairs_per_request: int):
+    return [
+        [(f"question {i} about retrieval", PASSAGE * (1 + j % 3)) for j in range(pairs_per_request)]
+        for i in range(total_requests)
+    ]
+
+
+def _run(predict, requests: list, concurrency: int) -> float:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(predict, requests))
+    return time.perf_counter() - start
+
+
+def main():
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    total_requests = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    pairs_per_request = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+
+    batched = BatchedReranker()
+    model = batched.model
+    requests = _make_requests(total_requests, pairs_per_request)
+
+    # Warm up both paths so model load and first-call overhead are excluded
+    model.predict(requests[0])
+    batched.predict(requests[0])
+
+    per_call = _run(model.predict, requests, concurrency)
+    micro_batched = _run(batched.predict, requests, concurrency)
+
+    print(f"concurrency={concurrency} requests={total_requests} pairs/request={pairs_per_request}")
+    print(f"per-call      : {per_call:.2f}s  {total_requests / per_call:.1f} req/s")
+    print(f"micro-batched : {micro_batched:.2f}s  {total_requests / micro_batched:.1f} req/s")
+    print(f"batcher stats : {batched.stats()}")
+
+
+if __name__ == "__main__":
+    main()
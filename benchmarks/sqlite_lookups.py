@@ -0,0 +1,84 @@
+"""
+User lookups per second against the relational database, comparing a fresh
+sqlite3 connection per call (the previous repository behaviour) with the
+pooled WAL connections, from threads and from the event loop.
+
+Usage: python -m benchmarks.sqlite_lookups [concurrency] [lookups]
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+# Point the app at a scratch database before config is imported
+os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="sqlite-bench-")
+
+from pdf_chatbot import config
+from pdf_chatbot.db import setup, repository, async_repository
+from pdf_chatbot.db.connection_pool import SQLiteConnectionPool
+
+USERS = 1000
+
+
+def _get_user_fresh_connection(username: str) -> dict | None:
+    with sqlite3.connect(config.RELATIONAL_DB_NAME) as conn:
+        row = conn.execute(
+            "SELECT user_id, username, password_hash FROM accounts WHERE username = ? LIMIT 1",
+            (username,),
+        ).fetchone()
+    conn.close()
+    return {"user_id": row[0], "username": row[1], "password_hash": row[2]} if row else None
+
+
+def _seed_users():
+    with SQLiteConnectionPool.get_instance(config.RELATIONAL_DB_NAME).connection() as conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO accounts (username, password_hash) VALUES (?, ?)",
+            [(f"user{i}", "hash") for i in range(USERS)],
+        )
+
+
+def _threaded(lookup, usernames: list[str], concurrency: int) -> float:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(lookup, usernames))
+    return time.perf_counter() - start
+
+
+async def _async(usernames: list[str], concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def lookup(username: str):
+        async with semaphore:
+            return await async_repository.get_user(username)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(lookup(username) for username in usernames))
+    return time.perf_counter() - start
+
+
+def main():
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+
+    setup.initialize_db()
+    _seed_users()
+    usernames = [f"user{i % USERS}" for i in range(lookups)]
+
+    fresh = _threaded(_get_user_fresh_connection, usernames, concurrency)
+    pooled = _threaded(repository.get_user, usernames, concurrency)
+    pooled_async = asyncio.run(_async(usernames, concurrency))
+
+    print(f"concurrency={concurrency} lookups={lookups}")
+    print(f"fresh connection : {lookups / fresh:,.0f} lookups/s")
+    print(f"pooled (threads) : {lookups / pooled:,.0f} lookups/s")
+    print(f"pooled (async)   : {lookups / pooled_async:,.0f} lookups/s")
+    print(f"pool stats       : {SQLiteConnectionPool.get_instance(config.RELATIONAL_DB_NAME).stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,13 @@
 from fastapi import Request
 from fastapi.responses import JSONResponse
 
+from pdf_chatbot.errors.auth_error import AuthError, PasswordHasherOverloadedError
 from pdf_chatbot.errors.document_error import DocumentError
+from pdf_chatbot.errors.chat_error import ChatError
 from pdf_chatbot.errors.rag_agent_error import RAGAgentError
+from pdf_chatbot.errors.scheduler_error import CapacityExceededError, SchedulerError
 from pdf_chatbot.schemas.common import ErrorResponse, ErrorCode
+from pdf_chatbot import config
 
 
 def document_error_handler(request: Request, e: DocumentError):
@@ -16,6 +20,60 @@ def document_error_handler(request: Request, e: DocumentError):
         },
     )
 
+def document_not_found_error_handler(request: Request, e: DocumentError):
+    return JSONResponse(
+        status_code=404,
+        content={
+            "detail": ErrorResponse.from_data(
+                error_code=ErrorCode.NOT_FOUND, error_message=str(e)
+            ).model_dump()
+        },
+    )
+
+
+def chat_error_handler(request: Request, e: ChatError):
+    return JSONResponse(
+        status_code=400,
+        content={
+            "detail": ErrorResponse.from_data(
+                error_code=ErrorCode.BAD_REQUEST, error_message=str(e)
+            ).model_dump()
+        },
+    )
+
+
+def auth_error_handler(request: Request, e: AuthError):
+    headers = None
+    if isinstance(e, PasswordHasherOverloadedError):
+        headers = {"Retry-After": str(config.PASSWORD_HASH_RETRY_AFTER_SECONDS)}
+    return JSONResponse(
+        status_code=503,
+        headers=headers,
+        content={
+            "detail": ErrorResponse.from_data(
+                error_code=ErrorCode.SERVICE_UNAVAILABLE, error_message=str(e)
+            ).model_dump()
+        },
+    )
+
+
+def scheduler_error_handler(request: Request, e: SchedulerError):
+    # Full queue: back off (429); waited too long for a slot: overloaded (503)
+    if isinstance(e, CapacityExceededError):
+        status_code, error_code = 429, ErrorCode.TOO_MANY_REQUESTS
+    else:
+        status_code, error_code = 503, ErrorCode.SERVICE_UNAVAILABLE
+    return JSONResponse(
+        status_code=status_code,
+        headers={"Retry-After": str(config.SCHEDULER_RETRY_AFTER_SECONDS)},
+        content={
+            "detail": ErrorResponse.from_data(
+                error_code=error_code, error_message=str(e)
+            ).model_dump()
+        },
+    )
+
+
 def rag_agent_error_handler(request: Request, e: DocumentError):
     return JSONResponse(
         status_code=503,
@@ -1,42 +1,60 @@
-from fastapi import FastAPI, Header, Body, status, Depends
-from fastapi.exceptions import HTTPException
-from contextlib import asynccontextmanager
-from pydantic import UUID4
-from typing import Annotated
+from fastapi import APIRouter, Header, Body, Query, Request, status, Depends
+from fastapi.exceptions import HTTPException, RequestValidationError
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import UUID4, BaseModel, ValidationError
+from typing import Annotated, AsyncIterator
 import base64
 import binascii
+import json
 
 from pdf_chatbot.user.account import create_account, authenticate_and_get_user
+from pdf_chatbot.user.password_hasher import password_hasher
 from pdf_chatbot.user.session import session_manager
-from pdf_chatbot.chat.chat_handler import smart_chat
-from pdf_chatbot.db import setup
+from pdf_chatbot.chat.chat_handler import smart_chat, smart_chat_stream
+from pdf_chatbot.chat.history import get_history_page, record_chat_turn
+from pdf_chatbot.db.async_repository import run_in_db_thread
+from pdf_chatbot.db.connection_pool import SQLiteConnectionPool
+from pdf_chatbot.documents.upload import MultipartUpload, spool_multipart_upload
+from pdf_chatbot.llm.model_manager import llm_client_registry
+from pdf_chatbot.model_registry import model_registry
+from pdf_chatbot.rag.answer_cache import answer_cache
+from pdf_chatbot.rag.enrichment_cache import enrichment_cache
+from pdf_chatbot.scheduler import scheduler
 from pdf_chatbot.schemas.auth import LoginRequest, LoginResponse, LogoutResponse
 from pdf_chatbot.schemas.common import ErrorResponse, ErrorCode
-from pdf_chatbot.schemas.chat import ChatHistoryResponse, ChatRequest, ChatResponse
-from pdf_chatbot.errors.document_error import DocumentError, InvalidDocumentError
-from pdf_chatbot.errors.rag_agent_error import RAGAgentError
-from pdf_chatbot.api.error_handlers import (
-    document_error_handler,
-    rag_agent_error_handler,
+from pdf_chatbot.schemas.chat import (
+    ChatDeltaResponse,
+    ChatHistoryResponse,
+    ChatRequest,
+    ChatResponse,
+    ChatResponseMode,
+    ChatStreamDone,
+    ChatStreamToken,
+    File,
 )
+from pdf_chatbot.schemas.document import IngestionJobResponse
+from pdf_chatbot.schemas.health import (
+    HealthResponse,
+    MetricsResponse,
+    ReadinessResponse,
+)
+from pdf_chatbot.documents.ingestion_jobs import ingestion_job_manager
+from pdf_chatbot.errors.document_error import (
+    DocumentNotFoundError,
+    InvalidDocumentError,
+)
+from pdf_chatbot.errors.base import PDFChatbotError
+from pdf_chatbot.errors.chat_error import InvalidCursorError
+from pdf_chatbot import config
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    setup.setup_chat_history()
-    setup.initialize_db()
-    yield
-
-
-app = FastAPI(lifespan=lifespan)
-app.add_exception_handler(DocumentError, document_error_handler)
-app.add_exception_handler(RAGAgentError, rag_agent_error_handler)
+router = APIRouter()
 
 
 async def authentication_layer(
     session_id: Annotated[UUID4, Header(alias="X-Session-UUID")],
 ):
-    session = session_manager.get_session(session_id=str(session_id))
+    session = await session_manager.aget_session(str(session_id))
     if not session:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -48,18 +66,133 @@ async def authentication_layer(
     return session
 
 
-@app.post(path="/account/signup")
-def user_signup(user_data: Annotated[LoginRequest, Body()]) -> LoginResponse:
-    user_id = create_account(username=user_data.username, password=user_data.password)
-    session_id = session_manager.create_session(user_id=user_id)
+def _decode_file(file: File) -> bytes:
+    try:
+        encoded_bytes = file.file_content_base64.encode("utf-8")
+        return base64.b64decode(encoded_bytes, validate=True)
+    except (ValueError, binascii.Error):
+        raise InvalidDocumentError(
+            f"Invalid base64 encoding for file '{file.file_name}'"
+        )
+
+
+def _chat_request_from_form(upload: MultipartUpload) -> ChatRequest:
+    document_hash_ids = upload.fields.get("document_hash_ids")
+    try:
+        agent_config = json.loads(upload.field("agent_config") or "{}")
+        return ChatRequest.model_validate(
+            {
+                "message": upload.field("message"),
+                "agent_config": agent_config,
+                # A present but empty field clears the active documents
+                "document_hash_ids": (
+                    [value for value in document_hash_ids if value]
+                    if document_hash_ids is not None
+                    else None
+                ),
+                "response_mode": upload.field("response_mode") or ChatResponseMode.FULL,
+            }
+        )
+    except json.JSONDecodeError:
+        raise RequestValidationError(
+            [{"loc": ("body", "agent_config"), "msg": "Invalid JSON", "type": "json_invalid"}]
+        )
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+
+
+def _sse_event(event: str, payload: BaseModel) -> str:
+    return f"event: {event}\ndata: {payload.model_dump_json()}\n\n"
+
+
+async def _chat_event_stream(
+    session: dict, events: AsyncIterator[dict]
+) -> AsyncIterator[str]:
+    try:
+        async for event in events:
+            if event["type"] == "token":
+                yield _sse_event("token", ChatStreamToken(content=event["content"]))
+                continue
+            await run_in_db_thread(record_chat_turn, session, event["chat_history"])
+            await run_in_db_thread(session_manager.save_session, session)
+            yield _sse_event(
+                "done",
+                ChatStreamDone.from_data(
+                    chat_thread=event["chat_history"],
+                    is_evidence_based=event["is_evidence_based"],
+                    evidences=event["evidences"],
+                ),
+            )
+    except PDFChatbotError as e:
+        # Headers are already sent, so failures are reported in-band
+        yield _sse_event(
+            "error",
+            ErrorResponse.from_data(
+                error_code=ErrorCode.INTERNAL_ERROR, error_message=str(e)
+            ),
+        )
+    except Exception as e:
+        print(f"Chat stream failed: {e!r}")
+        yield _sse_event(
+            "error",
+            ErrorResponse.from_data(
+                error_code=ErrorCode.INTERNAL_ERROR,
+                error_message="Unexpected error while generating the response",
+            ),
+        )
+
+
+@router.get("/healthz")
+def healthz() -> HealthResponse:
+    return HealthResponse()
+
+
+@router.get("/readyz")
+def readyz() -> ReadinessResponse:
+    readiness = ReadinessResponse.from_data(
+        ready=model_registry.is_ready(),
+        warmup_seconds=model_registry.warmup_seconds,
+        components=model_registry.stats(),
+    )
+    if readiness.data.ready:
+        return readiness
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=readiness.model_dump(mode="json"),
+    )
+
+
+@router.get("/metrics")
+def metrics() -> MetricsResponse:
+    return MetricsResponse(
+        data={
+            "password_hasher": password_hasher.stats(),
+            "scheduler": scheduler.stats(),
+            "llm_clients": llm_client_registry.stats(),
+            "answer_cache": answer_cache.stats(),
+            "query_enrichment": enrichment_cache.stats(),
+            "sessions": session_manager.stats(),
+            "sqlite_pool": SQLiteConnectionPool.get_instance().stats(),
+        }
+    )
+
+
+@router.post(path="/account/signup")
+async def user_signup(user_data: Annotated[LoginRequest, Body()]) -> LoginResponse:
+    user_id = await create_account(
+        username=user_data.username, password=user_data.password
+    )
+    session_id = await run_in_db_thread(
+        session_manager.create_session, user_id=user_id
+    )
     return LoginResponse.from_data(session_uuid=session_id)
 
 
-@app.post(path="/account/login")
-def user_login(
+@router.post(path="/account/login")
+async def user_login(
     req_body: Annotated[LoginRequest, Body()],
 ) -> LoginResponse | ErrorResponse:
-    user = authenticate_and_get_user(
+    user = await authenticate_and_get_user(
         username=req_body.username, password=req_body.password
     )
     if not user:
@@ -70,11 +203,13 @@ def user_login(
                 error_message="Incorrect UserID or Password.",
             ).model_dump(),
         )
-    session_id = session_manager.create_session(user_id=user["user_id"])
+    session_id = await run_in_db_thread(
+        session_manager.create_session, user_id=user["user_id"]
+    )
     return LoginResponse.from_data(session_uuid=session_id)
 
 
-@app.post(path="/account/logut")
+@router.post(path="/account/logut")
 def user_logout(
     session_id: Annotated[UUID4, Header(alias="X-Session-UUID")],
 ) -> LogoutResponse:
@@ -82,33 +217,144 @@ def user_logout(
     return LogoutResponse()
 
 
-@app.get("/chat/history")
+def _chat_reply(
+    chat_thread: list, response_mode: ChatResponseMode
+) -> ChatResponse | ChatDeltaResponse:
+    if response_mode == ChatResponseMode.DELTA:
+        return ChatDeltaResponse.from_data(chat_thread=chat_thread)
+    return ChatResponse.from_data(chat_thread=chat_thread)
+
+
+@router.get("/chat/history")
 def get_chat_history(
     session: Annotated[dict, Depends(authentication_layer)],
+    limit: Annotated[
+        int, Query(ge=1, le=config.CHAT_HISTORY_MAX_PAGE_SIZE)
+    ] = config.CHAT_HISTORY_PAGE_SIZE,
+    before: str | None = None,
+    after: str | None = None,
 ) -> ChatHistoryResponse | ErrorResponse:
-    return ChatHistoryResponse.from_data(chat_history=session["chat_history"])
+    """
+    Pages through the conversation by message id. Without a cursor the
+    newest messages are returned; 'before' walks back to older messages and
+    'after' fetches messages newer than the given one.
+    """
+
+    if before is not None and after is not None:
+        raise InvalidCursorError("Pass only one of 'before' or 'after'")
+    messages, next_cursor = get_history_page(
+        session["user_id"], limit=limit, before=before, after=after
+    )
+    return ChatHistoryResponse.from_data(chat_history=messages, next_cursor=next_cursor)
 
 
-@app.post("/chat")
+@router.post("/chat")
 async def chat(
     chat_request: ChatRequest,
     session: Annotated[dict, Depends(authentication_layer)],
-) -> ChatResponse | ErrorResponse:
-
-    binary_files = []
-    for file in chat_request.files:
-        try:
-            encoded_bytes = file.file_content_base64.encode("utf-8")
-            binary_files.append(base64.b64decode(encoded_bytes, validate=True))
-        except (ValueError, binascii.Error):
-            raise InvalidDocumentError(
-                f"Invalid base64 encoding for file '{file.file_name}'"
-            )
+) -> ChatResponse | ChatDeltaResponse | ErrorResponse:
+
+    binary_files = [_decode_file(file) for file in chat_request.files]
     chat_thread = await smart_chat(
         session=session,
         input=chat_request.message,
         files=binary_files,
         agent_config=chat_request.agent_config,
+        document_hash_ids=chat_request.document_hash_ids,
     )
-    session["chat_history"] = chat_thread
-    return ChatResponse.from_data(chat_thread=chat_thread)
+    await run_in_db_thread(record_chat_turn, session, chat_thread)
+    await run_in_db_thread(session_manager.save_session, session)
+    return _chat_reply(chat_thread, chat_request.response_mode)
+
+
+@router.post("/chat/upload")
+async def chat_upload(
+    request: Request,
+    session: Annotated[dict, Depends(authentication_layer)],
+) -> ChatResponse | ChatDeltaResponse | ErrorResponse:
+    """
+    Multipart variant of /chat: form fields 'message', optional
+    'agent_config' (JSON), 'response_mode' and repeated 'document_hash_ids', with PDFs
+    uploaded as 'files' parts and spooled to disk instead of base64 JSON.
+    """
+
+    with await spool_multipart_upload(request) as upload:
+        chat_request = _chat_request_from_form(upload)
+        chat_thread = await smart_chat(
+            session=session,
+            input=chat_request.message,
+            files=upload.files,
+            agent_config=chat_request.agent_config,
+            document_hash_ids=chat_request.document_hash_ids,
+        )
+    await run_in_db_thread(record_chat_turn, session, chat_thread)
+    await run_in_db_thread(session_manager.save_session, session)
+    return _chat_reply(chat_thread, chat_request.response_mode)
+
+
+@router.post("/chat/stream")
+async def chat_stream(
+    chat_request: ChatRequest,
+    session: Annotated[dict, Depends(authentication_layer)],
+) -> StreamingResponse:
+    """
+    Server-sent events: 'token' events carry response deltas, then a single
+    'done' event carries the full response and its grounding verdict.
+    """
+
+    binary_files = [_decode_file(file) for file in chat_request.files]
+    events = await smart_chat_stream(
+        session=session,
+        input=chat_request.message,
+        files=binary_files,
+        agent_config=chat_request.agent_config,
+        document_hash_ids=chat_request.document_hash_ids,
+    )
+    return StreamingResponse(
+        _chat_event_stream(session, events), media_type="text/event-stream"
+    )
+
+
+@router.post("/documents", status_code=status.HTTP_202_ACCEPTED)
+async def upload_document(
+    file: Annotated[File, Body()],
+    session: Annotated[dict, Depends(authentication_layer)],
+) -> IngestionJobResponse | ErrorResponse:
+    job = await ingestion_job_manager.submit(
+        user_id=session["user_id"], file=_decode_file(file), file_name=file.file_name
+    )
+    return IngestionJobResponse.from_data(job=job)
+
+
+@router.get("/documents/{job_id}")
+async def get_document_job(
+    job_id: str,
+    session: Annotated[dict, Depends(authentication_layer)],
+) -> IngestionJobResponse | ErrorResponse:
+    job = await ingestion_job_manager.get_job(user_id=session["user_id"], job_id=job_id)
+    if not job:
+        raise DocumentNotFoundError(f"Document ingestion job '{job_id}' not found")
+    return IngestionJobResponse.from_data(job=job)
+
+
+@router.post("/documents/upload", status_code=status.HTTP_202_ACCEPTED)
+async def upload_document_multipart(
+    request: Request,
+    session: Annotated[dict, Depends(authentication_layer)],
+) -> IngestionJobResponse | ErrorResponse:
+    """Multipart variant of POST /documents taking a single PDF 'file' part."""
+
+    upload = await spool_multipart_upload(request, max_files=1)
+    if len(upload.files) != 1:
+        upload.cleanup()
+        raise InvalidDocumentError("Expected one PDF uploaded as the 'file' part")
+    file = upload.files[0]
+    try:
+        # The job owns the spooled file from here and removes it when done
+        job = await ingestion_job_manager.submit(
+            user_id=session["user_id"], file=file, file_name=file.file_name
+        )
+    except Exception:
+        upload.cleanup()
+        raise
+    return IngestionJobResponse.from_data(job=job)
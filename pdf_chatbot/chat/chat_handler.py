@@ -1,22 +1,28 @@
-from pdf_chatbot.rag.rag_agent import RAGAgent
+from pdf_chatbot.rag.rag_agent import rag_agent
 from pdf_chatbot.documents.document_processor import (
     verify_user_documents,
     save_user_documents,
+    get_active_user_documents,
 )
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
 from langchain_core.runnables import Runnable
 from pdf_chatbot import config
 from pdf_chatbot.llm.prompt_templates import SIMPLE_CHAT_PROMPT_TEMPLATE
 from pdf_chatbot.llm.model_manager import get_llm_instance_async
+from pdf_chatbot.documents.upload import SpooledUpload
+from pdf_chatbot.chat.history import ensure_message_ids
 from pdf_chatbot.schemas.agent import AgentConfig, RAGAgentState
+from pdf_chatbot.db.async_repository import run_in_db_thread
+from pdf_chatbot.scheduler import scheduler
+from typing import AsyncIterator
 
 
-async def rag_chat(
+def _build_agent_state(
     session: dict,
     input: str,
-    files: list[bytes],
-    agent_config: AgentConfig | None = AgentConfig(),
-) -> list[BaseMessage]:
+    document_hash_ids: list[str],
+    agent_config: AgentConfig | None,
+) -> RAGAgentState:
 
     if not session or type(session) != dict:
         raise ValueError("Missing or Invalid required parameter 'session'")
@@ -24,25 +30,57 @@ async def rag_chat(
         raise ValueError("Required key 'user_id' not found in 'session'")
     if not input or type(input) != str or input.strip() == "":
         raise ValueError("Missing or Invalid required parameter 'input'")
-    if not files or type(files) != list or len(files) == 0:
+    if (
+        not document_hash_ids
+        or type(document_hash_ids) != list
+        or len(document_hash_ids) == 0
+    ):
         raise ValueError(
-            "Missing or Invalid required parameter 'files' for PDF RAG chat"
+            "Missing or Invalid required parameter 'document_hash_ids' for PDF RAG chat"
         )
 
-    document_hash_ids = await _ingest_documents(files, session.get("user_id"))
-
-    agent_state = RAGAgentState(
+    return RAGAgentState(
         user_id=int(session["user_id"]),
         input=input,
         messages=session["chat_history"] or [],
         active_documents_hash_list=document_hash_ids,
         config=agent_config,
     )
-    agent = RAGAgent()
-    result_state = await agent.ainvoke(state=agent_state)
+
+
+async def rag_chat(
+    session: dict,
+    input: str,
+    document_hash_ids: list[str],
+    agent_config: AgentConfig | None = AgentConfig(),
+) -> list[BaseMessage]:
+
+    agent_state = _build_agent_state(session, input, document_hash_ids, agent_config)
+    result_state = await rag_agent.ainvoke(state=agent_state)
     return result_state["messages"]
 
 
+async def rag_chat_stream(
+    session: dict,
+    input: str,
+    document_hash_ids: list[str],
+    agent_config: AgentConfig | None = AgentConfig(),
+) -> AsyncIterator[dict]:
+
+    agent_state = _build_agent_state(session, input, document_hash_ids, agent_config)
+    async for event in rag_agent.astream(state=agent_state):
+        if event["type"] == "token":
+            yield event
+            continue
+        result_state = event["state"]
+        yield {
+            "type": "done",
+            "chat_history": result_state["messages"],
+            "is_evidence_based": result_state.get("is_evidence_based"),
+            "evidences": result_state.get("evidences") or [],
+        }
+
+
 async def simple_chat(
     session: dict, input: str, llm_platform: str = config.DEFAULT_LLM_PLATFORM
 ) -> list[BaseMessage]:
@@ -51,28 +89,137 @@ async def simple_chat(
     chain: Runnable = SIMPLE_CHAT_PROMPT_TEMPLATE | await get_llm_instance_async(
         platform=llm_platform
     )
-    response = await chain.ainvoke({"input": input, "messages": chat_history})
+    async with scheduler.slot("llm"):
+        response = await chain.ainvoke({"input": input, "messages": chat_history})
     chat_history.append(HumanMessage(content=input))
     chat_history.append(response)
     return chat_history
 
 
+async def simple_chat_stream(
+    session: dict, input: str, llm_platform: str = config.DEFAULT_LLM_PLATFORM
+) -> AsyncIterator[dict]:
+
+    chat_history = session.get("chat_history") or []
+    chain: Runnable = SIMPLE_CHAT_PROMPT_TEMPLATE | await get_llm_instance_async(
+        platform=llm_platform
+    )
+    content = ""
+    async with scheduler.slot("llm"):
+        async for chunk in chain.astream({"input": input, "messages": chat_history}):
+            if chunk.content:
+                content += chunk.content
+                yield {"type": "token", "content": chunk.content}
+    chat_history.append(HumanMessage(content=input))
+    chat_history.append(AIMessage(content=content))
+    yield {
+        "type": "done",
+        "chat_history": chat_history,
+        "is_evidence_based": None,
+        "evidences": [],
+    }
+
+
 async def smart_chat(
     session: dict,
     input: str,
-    files: list[bytes] | None = None,
+    files: list[bytes | SpooledUpload] | None = None,
     agent_config: AgentConfig = AgentConfig(),
+    document_hash_ids: list[str] | None = None,
 ) -> list[BaseMessage]:
-    if not files or type(files) != list or len(files) == 0:
-        return await simple_chat(
+    active_document_hash_ids = await _resolve_active_documents(
+        session, files, document_hash_ids
+    )
+    if not active_document_hash_ids:
+        chat_thread = await simple_chat(
             session=session, input=input, llm_platform=agent_config.llm_platform
         )
     else:
-        return await rag_chat(
-            session=session, input=input, files=files, agent_config=agent_config
+        chat_thread = await rag_chat(
+            session=session,
+            input=input,
+            document_hash_ids=active_document_hash_ids,
+            agent_config=agent_config,
+        )
+    return ensure_message_ids(chat_thread)
+
+
+async def smart_chat_stream(
+    session: dict,
+    input: str,
+    files: list[bytes | SpooledUpload] | None = None,
+    agent_config: AgentConfig = AgentConfig(),
+    document_hash_ids: list[str] | None = None,
+) -> AsyncIterator[dict]:
+    """
+    Streaming counterpart of smart_chat. Documents are resolved (and
+    uploads ingested) before returning, so request errors surface before
+    the first event. The returned iterator yields {"type": "token",
+    "content"} events followed by one {"type": "done", "chat_history",
+    "is_evidence_based", "evidences"} event.
+    """
+
+    active_document_hash_ids = await _resolve_active_documents(
+        session, files, document_hash_ids
+    )
+    if not active_document_hash_ids:
+        events = simple_chat_stream(
+            session=session, input=input, llm_platform=agent_config.llm_platform
+        )
+    else:
+        events = rag_chat_stream(
+            session=session,
+            input=input,
+            document_hash_ids=active_document_hash_ids,
+            agent_config=agent_config,
+        )
+    return _finalize_stream(events)
+
+
+async def _finalize_stream(events: AsyncIterator[dict]) -> AsyncIterator[dict]:
+    streamed = False
+    async for event in events:
+        if event["type"] == "token":
+            streamed = True
+        else:
+            ensure_message_ids(event["chat_history"])
+            # Fallback replies (no context, LLM errors) are never streamed by the agent
+            if not streamed:
+                yield {"type": "token", "content": event["chat_history"][-1].content}
+        yield event
+
+
+async def _resolve_active_documents(
+    session: dict,
+    files: list[bytes | SpooledUpload] | None = None,
+    document_hash_ids: list[str] | None = None,
+) -> list[str]:
+    """
+    Works out which documents a chat turn is grounded on, and remembers them
+    in the session's active_docs so later turns can carry only text.
+    Uploaded files (optionally together with referenced hashes) replace the
+    active set; hashes alone replace it; neither keeps the previous set.
+    """
+
+    active_document_hash_ids = session.get("active_docs") or []
+    if document_hash_ids is not None:
+        active_document_hash_ids = await run_in_db_thread(
+            get_active_user_documents,
+            user_id=session["user_id"],
+            document_hash_ids=document_hash_ids,
+        )
+    if files:
+        uploaded_hash_ids = await _ingest_documents(files, session.get("user_id"))
+        active_document_hash_ids = list(
+            dict.fromkeys(
+                (active_document_hash_ids if document_hash_ids is not None else [])
+                + uploaded_hash_ids
+            )
         )
+    session["active_docs"] = active_document_hash_ids
+    return active_document_hash_ids
 
 
-async def _ingest_documents(files: list[bytes], user_id: int):
+async def _ingest_documents(files: list[bytes | SpooledUpload], user_id: int):
     verify_user_documents(files=files)
     return await save_user_documents(files=files, user_id=user_id)
@@ -1,34 +1,42 @@
 import gradio as gr
-from langchain_core.messages import AIMessage, HumanMessage
+from datetime import datetime
 import pdf_chatbot.config as config
-from pdf_chatbot.chat.chat_handler import smart_chat
+from pdf_chatbot.chat.chat_handler import smart_chat_stream
 from pdf_chatbot.errors.base import PDFChatbotError
-from pdf_chatbot.db.repository import get_user
+from pdf_chatbot.db import async_repository
 from pdf_chatbot.schemas.agent import AgentConfig
+from pdf_chatbot.user.session_store import InMemorySessionStore
 
 
-def _format_messages_to_gradio_chat(
-    messages: list[AIMessage | HumanMessage],
-) -> list[dict]:
-    formatted_messages = []
-    for message in messages:
-        if type(message) == AIMessage:
-            formatted_messages.append({"role": "assistant", "content": message.content})
-        elif type(message) == HumanMessage:
-            formatted_messages.append({"role": "user", "content": message.content})
-    return formatted_messages
+# Conversations of open Gradio tabs keyed by gr.Request.session_hash. The
+# LangChain history and the rendered chat live here, so a turn only appends
+# to them instead of round-tripping and reconverting the whole conversation
+_conversations = InMemorySessionStore(max_size=config.GRADIO_MAX_CONVERSATIONS)
 
 
-def _format_messages_to_langchain(
-    messages: list[dict],
-) -> list[AIMessage | HumanMessage]:
-    formatted_messages = []
-    for message in messages:
-        if str(message["role"]) == "user":
-            formatted_messages.append(HumanMessage(content=message["content"]))
-        elif str(message["role"]) == "assistant":
-            formatted_messages.append(AIMessage(content=message["content"]))
-    return formatted_messages
+async def _get_conversation(session_hash: str, username: str) -> dict | None:
+    conversation = _conversations.get(session_hash)
+    if conversation and conversation["username"] == username:
+        return conversation
+
+    user_obj = await async_repository.get_user(username=username)
+    if not user_obj:
+        return None
+    conversation = {
+        "session_id": session_hash,
+        "user_id": user_obj["user_id"],
+        "username": username,
+        "chat_history": [],
+        "chat_display": [],
+        "active_docs": [],
+        "last_active_at": datetime.now(),
+    }
+    _conversations.put(conversation)
+    return conversation
+
+
+def _drop_conversation(request: gr.Request):
+    _conversations.delete(request.session_hash)
 
 
 def _gradio_pre_processing(
@@ -36,7 +44,6 @@ def _gradio_pre_processing(
     user: str,
     llm_platform: str,
     msg: str,
-    chat_history: list[dict],
     q_enrich: bool,
 ):
     state = state or {}
@@ -44,7 +51,6 @@ def _gradio_pre_processing(
         state["input"] = msg
     if user:
         state["user"] = user
-    state["chat_history"] = chat_history or []
     state["llm_platform"] = llm_platform or config.DEFAULT_LLM_PLATFORM
     state["query_enrichment_enabled"] = q_enrich
     state.pop("error", None)
@@ -63,46 +69,80 @@ def _gradio_pre_processing(
     )
 
 
-async def warn_and_return(gr_state: dict, msg: str):
+async def warn_and_return(gr_state: dict, msg: str, chat_display: list[dict]):
     gr.Warning(msg)
     gr_state["error"] = "ERROR"
-    return gr_state, gr_state["chat_history"]
+    return gr_state, chat_display
 
 
-async def gradio_chat(state: dict, files: list[bytes] | None = None):
+async def gradio_chat(
+    state: dict, files: list[bytes] | None = None, request: gr.Request = None
+):
+    """Yields (state, chat) updates so the answer renders as it is generated."""
 
+    previous = _conversations.get(request.session_hash)
+    chat_display = previous["chat_display"] if previous else []
     if (not state.get("input")) or state.get("input").strip() == "":
-        return warn_and_return(state, "Please enter a User query in the input box")
+        yield await warn_and_return(
+            state, "Please enter a User query in the input box", chat_display
+        )
+        return
     if (not state.get("user")) or state.get("user").strip() == "":
-        return warn_and_return(
-            state, "Please select a valid username from the dropdown."
+        yield await warn_and_return(
+            state, "Please select a valid username from the dropdown.", chat_display
         )
-
-    user_obj = get_user(username=state["user"])
-    if not user_obj:
-        return warn_and_return(
-            state, "Unaotherised User. Selected user doesn't have valid access."
+        return
+
+    conversation = await _get_conversation(request.session_hash, state["user"])
+    if not conversation:
+        yield await warn_and_return(
+            state,
+            "Unaotherised User. Selected user doesn't have valid access.",
+            chat_display,
         )
-    chat_session = {
-        "user_id": user_obj["user_id"],
-        "chat_history": _format_messages_to_langchain(state["chat_history"]),
-    }
+        return
+    conversation["last_active_at"] = datetime.now()
+    chat_display = conversation["chat_display"]
+    answered = False
     try:
-        state["chat_history"] = await smart_chat(
-            chat_session,
+        events = await smart_chat_stream(
+            conversation,
             input=state["input"],
             files=files,
+            # The file widget is the source of truth: no files means general chat
+            document_hash_ids=[],
             agent_config=AgentConfig(
                 llm_platform=state["llm_platform"],
                 query_enrichment_enabled=state["query_enrichment_enabled"],
             ),
         )
+        chat_display.append({"role": "user", "content": state["input"]})
+        chat_display.append({"role": "assistant", "content": ""})
+        async for event in events:
+            if event["type"] == "token":
+                chat_display[-1]["content"] += event["content"]
+                yield state, chat_display
+            else:
+                chat_display[-1]["content"] = event["chat_history"][-1].content
+                # Same prompting window as the API; both lists are trimmed
+                # together so they stay aligned message for message
+                window = config.CHAT_HISTORY_WINDOW_MESSAGES
+                conversation["chat_history"] = event["chat_history"][-window:]
+                del chat_display[:-window]
+                answered = True
     except PDFChatbotError as e:
         gr.Warning(str(e))
         state["error"] = "PDF_CHATBOT_ERROR"
-        return state, state["chat_history"]
+    except Exception as e:
+        print(f"Gradio chat turn failed: {e!r}")
+        gr.Warning("Something went wrong while answering. Please try again.")
+        state["error"] = "ERROR"
+    finally:
+        if not answered:
+            # Drop the unanswered turn; the LangChain history is only replaced on success
+            del chat_display[len(conversation["chat_history"]) :]
 
-    return state, _format_messages_to_gradio_chat(state["chat_history"])
+    yield state, chat_display
 
 
 def _gradio_post_processing(state: dict):
@@ -182,7 +222,7 @@ def create_gradio_chat_interface():
 
         send.click(
             fn=_gradio_pre_processing,
-            inputs=[gr_state, user, llm_platform, msg, chatbot, q_enrich],
+            inputs=[gr_state, user, llm_platform, msg, q_enrich],
             outputs=[gr_state, llm_platform, msg, user, send],
         ).then(
             fn=gradio_chat, inputs=[gr_state, files], outputs=[gr_state, chatbot]
@@ -193,7 +233,7 @@ def create_gradio_chat_interface():
         )
         msg.submit(
             fn=_gradio_pre_processing,
-            inputs=[gr_state, user, llm_platform, msg, chatbot, q_enrich],
+            inputs=[gr_state, user, llm_platform, msg, q_enrich],
             outputs=[gr_state, llm_platform, msg, user, send, q_enrich],
         ).then(
             fn=gradio_chat, inputs=[gr_state, files], outputs=[gr_state, chatbot]
@@ -202,5 +242,6 @@ def create_gradio_chat_interface():
             inputs=[gr_state],
             outputs=[llm_platform, msg, user, send, q_enrich],
         )
+        app.unload(_drop_conversation)
 
     return app
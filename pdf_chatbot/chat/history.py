@@ -0,0 +1,84 @@
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+from pdf_chatbot.db import repository
+from pdf_chatbot.errors.chat_error import InvalidCursorError
+from pdf_chatbot import config
+import json
+import uuid
+
+
+def ensure_message_ids(messages: list[BaseMessage]) -> list[BaseMessage]:
+    # Ids are assigned once and persisted with the history, so cursors stay valid
+    for message in messages:
+        if not message.id:
+            message.id = uuid.uuid4().hex
+    return messages
+
+
+def serialize_message(message: BaseMessage) -> str:
+    return json.dumps(message_to_dict(message))
+
+
+def _deserialize_rows(rows: list[tuple[int, str]]) -> list[BaseMessage]:
+    return messages_from_dict([json.loads(message) for _, message in rows])
+
+
+def append_messages(user_id: int, messages: list[BaseMessage]) -> None:
+    repository.insert_chat_messages(
+        user_id,
+        [(message.id, serialize_message(message)) for message in ensure_message_ids(messages)],
+    )
+
+
+def load_recent_messages(
+    user_id: int, limit: int = config.CHAT_HISTORY_WINDOW_MESSAGES
+) -> list[BaseMessage]:
+    rows = repository.get_chat_messages_before(user_id, limit)
+    return _deserialize_rows(rows[::-1])
+
+
+def record_chat_turn(session: dict, chat_thread: list[BaseMessage]) -> None:
+    """
+    Appends the messages a chat turn added to the user's conversation log
+    and trims the session's history to the recent prompting window.
+    """
+
+    persisted_count = session.get("persisted_message_count", 0)
+    append_messages(session["user_id"], chat_thread[persisted_count:])
+    window = chat_thread[-config.CHAT_HISTORY_WINDOW_MESSAGES :]
+    session["chat_history"] = window
+    session["persisted_message_count"] = len(window)
+
+
+def _seq_of(user_id: int, message_id: str) -> int:
+    seq = repository.get_chat_message_seq(user_id, message_id)
+    if seq is None:
+        raise InvalidCursorError(f"Unknown chat history cursor '{message_id}'")
+    return seq
+
+
+def get_history_page(
+    user_id: int,
+    limit: int,
+    before: str | None = None,
+    after: str | None = None,
+) -> tuple[list[BaseMessage], str | None]:
+    """
+    Returns one page of the conversation in chronological order, plus the
+    cursor to continue from, or None when there is nothing further.
+    By default pages walk backwards from the newest message ('before' the
+    cursor); with 'after' they walk forwards to catch up on new messages.
+    """
+
+    if after is not None:
+        rows = repository.get_chat_messages_after(
+            user_id, limit + 1, _seq_of(user_id, after)
+        )
+        has_more = len(rows) > limit
+        messages = _deserialize_rows(rows[:limit])
+        return messages, (messages[-1].id if has_more else None)
+
+    before_seq = _seq_of(user_id, before) if before is not None else None
+    rows = repository.get_chat_messages_before(user_id, limit + 1, before_seq)
+    has_more = len(rows) > limit
+    messages = _deserialize_rows(rows[:limit][::-1])
+    return messages, (messages[0].id if has_more else None)
@@ -10,15 +10,52 @@ is_prod = env == "prod"
 
 # API configs
 MAX_FILE_SIZE_MB = 10
+# Load models concurrently at startup (faster, but peaks memory and CPU together)
+MODEL_WARMUP_PARALLEL = os.getenv("MODEL_WARMUP_PARALLEL", "true").lower() == "true"
+MAX_FILES_PER_REQUEST = 3
+CHAT_HISTORY_PAGE_SIZE = 50
+CHAT_HISTORY_MAX_PAGE_SIZE = 500
+UPLOAD_SPOOL_DIR = DATA_DIR / ".uploads/"
+# Spooled uploads older than this are leftovers; other workers share the directory
+UPLOAD_SPOOL_STALE_SECONDS = 24 * 60 * 60
+
+# Document processing configs
+CONVERSION_POOL_WORKERS = int(os.getenv("CONVERSION_POOL_WORKERS", 2))
+CONVERSION_POOL_MAX_PENDING = 8
+# Conversion calls (page batches, warmup pings) a worker runs before it is recycled
+CONVERSION_WORKER_MAX_TASKS = 20
+CONVERSION_CACHE_DIR = DATA_DIR / ".conversion_cache/"
+CONVERSION_CACHE_MAX_SIZE_MB = 1024
+INGESTION_PAGE_BATCH_SIZE = 10
+# "token_bounded" caps chunks to the embedding model's window, "markdown_headers" splits on headers only
+CHUNKING_MODE = os.getenv("CHUNKING_MODE", "token_bounded")
+CHUNK_MAX_TOKENS = 256
+CHUNK_OVERLAP_TOKENS = 32
+INGESTION_JOBS_MAX_TRACKED = 1000
+INGESTION_EMBED_BATCH_SIZE = 64
+INGESTION_QUEUE_SIZE = 2
 
 # RAG configs
 VECTOR_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
 VECTOR_RETRIEVER_MAX_DOCS = 10
+QUERY_EMBEDDING_CACHE_SIZE = 1024
 DEFAULT_VECTOR_DB_PATH = DATA_DIR / ".chroma/"
 DEFAULT_VECTOR_COLLECTION_NAME = "pdf-chatbot-collection"
+LEXICAL_INDEX_DB_PATH = DATA_DIR / "lexical_index.sqlite"
 CROSS_ENCODER_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
 CROSS_ENCODER_RELEVANCE_THRUSHOLD = 0
+RERANKER_MAX_BATCH_SIZE = 64
+RERANKER_MAX_WAIT_MS = 10
+# Upper bound on a caller's wait for its batch, so a stuck worker cannot hang requests
+RERANKER_TIMEOUT_SECONDS = 30
+RETRIEVER_CACHE_MAX_SIZE = 128
+RETRIEVER_CACHE_TTL_SECONDS = 15 * 60
 RAG_DEFAULT_TIMEOUT = 20 if is_prod else 60
+# Grounded answers reused for near-identical first questions on the same documents
+ANSWER_CACHE_FEATURE_ENABLED = False
+ANSWER_CACHE_SIMILARITY_THRESHOLD = 0.95
+ANSWER_CACHE_MAX_SIZE = 2048
+ANSWER_CACHE_TTL_SECONDS = 6 * 60 * 60
 
 
 # LLM configs
@@ -28,10 +65,52 @@ DEFAULT_LLM_MODELS = {"ollama": "qwen3:8b", "gemini": "gemini-2.0-flash"}
 QUERY_ENRICHMENT_MODEL = {"ollama": "qwen2.5:3b", "gemini": "gemini-2.5-flash-lite"}
 RESPONSE_GENERATOR_MODEL = {"ollama": "qwen3:8b", "gemini": "gemini-2.0-flash"}
 LLM_DEFAULT_TIMEOUT = 20 if is_prod else 60
+# Connection pool of each reused LLM client (Ollama; Gemini manages its own)
+LLM_HTTP_MAX_CONNECTIONS = 32
+LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS = 60
 
 ## RAG Agent configs
 QUERY_ENRICHMENT_FEATURE_ENABLED = True if is_prod else False
+# Recent messages the enrichment prompt sees; also part of its cache key
+QUERY_ENRICHMENT_HISTORY_MESSAGES = 6
+QUERY_ENRICHMENT_CACHE_SIZE = 1024
+# Shorter inputs ("and the second one?") always go through enrichment
+QUERY_ENRICHMENT_SELF_CONTAINED_MIN_WORDS = 6
+# Retrieve on the raw input while enrichment runs; the enriched query is
+# only searched too when its word overlap with the input is below this
+SPECULATIVE_RETRIEVAL_FEATURE_ENABLED = False
+SPECULATIVE_RETRIEVAL_SKIP_SIMILARITY = 0.8
 
 # Relational Database
 RELATIONAL_DB_NAME = DATA_DIR / "accounts.sqlite"
-CHAT_HISTORY_ROOT_FOLDER = DATA_DIR / ".chat_history/"
+SQLITE_POOL_SIZE = 8
+SQLITE_BUSY_TIMEOUT_MS = 5000
+SQLITE_CACHE_SIZE_KB = 8 * 1024
+SQLITE_CACHED_STATEMENTS = 256
+# Most recent messages kept in the session and sent to the LLM as history
+CHAT_HISTORY_WINDOW_MESSAGES = 20
+
+# Sessions: "memory" is per process, "sqlite" shares sessions across API workers
+SESSION_STORE = os.getenv("SESSION_STORE", "memory")
+SESSION_IDLE_TTL_SECONDS = 60 * 60
+SESSION_MAX_IN_MEMORY = 10000
+SESSION_SWEEP_INTERVAL_SECONDS = 60
+# Open Gradio tabs whose conversation is kept server-side (LRU beyond this)
+GRADIO_MAX_CONVERSATIONS = 1000
+
+# Password hashing (argon2) runs in its own process pool; requests beyond
+# workers + max pending are rejected at once with 503 instead of queueing
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+PASSWORD_HASH_MAX_PENDING = 16
+PASSWORD_HASH_RETRY_AFTER_SECONDS = 1
+
+# Process-wide capacity per kind of work. Interactive requests beyond
+# max_queue get 429, and 503 after waiting SCHEDULER_MAX_WAIT_SECONDS
+SCHEDULER_POOLS = {
+    "conversion": {"capacity": CONVERSION_POOL_WORKERS, "max_queue": 32},
+    "embedding": {"capacity": 2, "max_queue": 64},
+    "reranking": {"capacity": 4, "max_queue": 64},
+    "llm": {"capacity": int(os.getenv("LLM_MAX_CONCURRENCY", 16)), "max_queue": 64},
+}
+SCHEDULER_MAX_WAIT_SECONDS = 30
+SCHEDULER_RETRY_AFTER_SECONDS = 5
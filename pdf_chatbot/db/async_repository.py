@@ -0,0 +1,45 @@
+"""
+Async wrappers over db.repository for code running on the event loop.
+Queries run on a dedicated thread pool sized to the connection pool, so
+database calls neither block the loop nor queue behind other to_thread work.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+from pdf_chatbot.db import repository
+from pdf_chatbot import config
+import functools
+import asyncio
+
+_db_executor = ThreadPoolExecutor(
+    max_workers=config.SQLITE_POOL_SIZE, thread_name_prefix="sqlite"
+)
+
+
+async def run_in_db_thread(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _db_executor, functools.partial(fn, *args, **kwargs)
+    )
+
+
+def _threaded(fn: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        return await run_in_db_thread(fn, *args, **kwargs)
+
+    return wrapper
+
+
+get_user = _threaded(repository.get_user)
+insert_user = _threaded(repository.insert_user)
+insert_user_document = _threaded(repository.insert_user_document)
+get_user_document_hashes = _threaded(repository.get_user_document_hashes)
+upsert_document_status = _threaded(repository.upsert_document_status)
+get_document_status = _threaded(repository.get_document_status)
+get_document_statuses = _threaded(repository.get_document_statuses)
+upsert_ingestion_job = _threaded(repository.upsert_ingestion_job)
+get_ingestion_job = _threaded(repository.get_ingestion_job)
+delete_finished_ingestion_jobs = _threaded(repository.delete_finished_ingestion_jobs)
+insert_chat_messages = _threaded(repository.insert_chat_messages)
+get_chat_messages_before = _threaded(repository.get_chat_messages_before)
@@ -0,0 +1,107 @@
+from contextlib import contextmanager
+from typing import Iterator
+import sqlite3
+import queue
+import threading
+import pdf_chatbot.config as config
+
+# Applied to every pooled connection; journal_mode=WAL also persists in the file
+_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    # WAL keeps the database consistent with NORMAL; only the last commits are at risk on power loss
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA foreign_keys = ON",
+    f"PRAGMA busy_timeout = {config.SQLITE_BUSY_TIMEOUT_MS}",
+    f"PRAGMA cache_size = -{config.SQLITE_CACHE_SIZE_KB}",
+    "PRAGMA temp_store = MEMORY",
+)
+
+
+class SQLiteConnectionPool:
+    """
+    Fixed-size pool of long-lived SQLite connections shared across threads.
+    Reusing connections keeps sqlite3's per-connection prepared statement
+    cache warm, and WAL mode lets readers proceed while a writer commits.
+    connection() behaves like 'with sqlite3.connect(...)': it commits on
+    success and rolls back on error, then returns the connection.
+    """
+
+    _pool_instances = {}
+    _instances_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls, db_path: str = config.RELATIONAL_DB_NAME):
+
+        db_path = str(db_path)
+        with cls._instances_lock:
+            if db_path not in cls._pool_instances:
+                cls._pool_instances[db_path] = cls(db_path)
+            return cls._pool_instances[db_path]
+
+    def __init__(
+        self,
+        db_path: str = config.RELATIONAL_DB_NAME,
+        size: int = config.SQLITE_POOL_SIZE,
+    ):
+        self.db_path = str(db_path)
+        self.size = size
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._opened = 0
+        self.waits = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            cached_statements=config.SQLITE_CACHED_STATEMENTS,
+        )
+        for pragma in _PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            can_open = self._opened < self.size
+            if can_open:
+                self._opened += 1
+        if can_open:
+            try:
+                return self._connect()
+            except Exception:
+                with self._lock:
+                    self._opened -= 1
+                raise
+        self.waits += 1
+        return self._idle.get()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self._acquire()
+        try:
+            with conn:
+                yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self) -> None:
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._opened -= 1
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "open": self._opened,
+            "idle": self._idle.qsize(),
+            "waits": self.waits,
+        }
@@ -0,0 +1,96 @@
+from pdf_chatbot.db import repository
+from pdf_chatbot.rag.vector_store import VectorStore
+from pdf_chatbot.rag.lexical_index import LexicalIndex
+from pdf_chatbot.chat.history import append_messages
+from langchain_core.messages import messages_from_dict
+from pathlib import Path
+import json
+
+MIGRATION_BATCH_SIZE = 500
+
+
+def migrate_to_shared_document_chunks(batch_size: int = MIGRATION_BATCH_SIZE) -> int:
+    """
+    Moves chunks stored once per user ("<user_id>:<hash>:<i>:") to a single
+    copy per document ("<hash>:<i>") and records each previous owner in
+    user_documents. Stored embeddings are reused, and re-running is a no-op.
+    Runs at startup, so it never loads the embedding model.
+    """
+
+    collection = VectorStore.get_instance().get_raw_collection()
+    if collection is None:
+        return 0
+    lexical_index = LexicalIndex.get_instance()
+    migrated_chunks = 0
+    migrated_documents = set()
+
+    while True:
+        results = collection.get(
+            where={"user_id": {"$gte": 0}},
+            limit=batch_size,
+            include=["embeddings", "documents", "metadatas"],
+        )
+        if not results["ids"]:
+            break
+
+        shared_chunks = {}
+        ownerships = set()
+        for embedding, document, metadata in zip(
+            results["embeddings"], results["documents"], results["metadatas"]
+        ):
+            metadata = dict(metadata)
+            user_id = metadata.pop("user_id")
+            document_hash_id = metadata["document_hash_id"]
+            chunk_index = metadata["chunk_id"].rsplit(":", 1)[-1]
+            metadata["chunk_id"] = f"{document_hash_id}:{chunk_index}"
+            shared_chunks[metadata["chunk_id"]] = (embedding, document, metadata)
+            ownerships.add((user_id, document_hash_id))
+
+        collection.upsert(
+            ids=list(shared_chunks.keys()),
+            embeddings=[chunk[0] for chunk in shared_chunks.values()],
+            documents=[chunk[1] for chunk in shared_chunks.values()],
+            metadatas=[chunk[2] for chunk in shared_chunks.values()],
+        )
+        for user_id, document_hash_id in ownerships:
+            repository.insert_user_document(user_id, document_hash_id)
+            migrated_documents.add(document_hash_id)
+        collection.delete(ids=results["ids"])
+        migrated_chunks += len(results["ids"])
+
+    for document_hash_id in migrated_documents:
+        if not lexical_index.document_exists(document_hash_id):
+            results = collection.get(
+                where={"document_hash_id": document_hash_id},
+                include=["metadatas", "documents"],
+            )
+            chunk_ids = [metadata["chunk_id"] for metadata in results["metadatas"]]
+            lexical_index.add(document_hash_id, chunk_ids, results["documents"])
+
+    return migrated_chunks
+
+
+def migrate_chat_history_files() -> int:
+    """
+    Imports the per-user "user_<id>.json" history files into chat_messages.
+    Users who already have messages are skipped, and each processed file is
+    renamed to "*.migrated", so re-running is a no-op.
+    """
+
+    migrated_messages = 0
+    for user_id, chat_json_path in repository.get_all_user_chat_histories():
+        file_path = Path(chat_json_path)
+        if not file_path.is_file():
+            continue
+        if not repository.user_has_chat_messages(user_id):
+            with open(file_path, "r") as chat_file:
+                messages = messages_from_dict(json.load(chat_file))
+            append_messages(user_id, messages)
+            migrated_messages += len(messages)
+        file_path.rename(file_path.with_name(file_path.name + ".migrated"))
+    return migrated_messages
+
+
+if __name__ == "__main__":
+    print(f"Migrated {migrate_chat_history_files()} chat messages")
+    print(f"Migrated {migrate_to_shared_document_chunks()} chunks")
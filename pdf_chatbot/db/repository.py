@@ -1,5 +1,9 @@
-import sqlite3
 from pdf_chatbot import config
+from pdf_chatbot.db.connection_pool import SQLiteConnectionPool
+
+
+def _connection():
+    return SQLiteConnectionPool.get_instance(config.RELATIONAL_DB_NAME).connection()
 
 
 def insert_user(username: str, password_hash: str) -> int:
@@ -8,7 +12,7 @@ def insert_user(username: str, password_hash: str) -> int:
         raise ValueError(f"The username '{username}' is already taken.")
 
     user_id = None
-    with sqlite3.connect(config.RELATIONAL_DB_NAME) as conn:
+    with _connection() as conn:
         cur = conn.cursor()
         user_id = cur.execute(
             """INSERT INTO accounts (username, password_hash) values (?, ?) RETURNING user_id""",
@@ -20,27 +24,9 @@ def insert_user(username: str, password_hash: str) -> int:
     return user_id
 
 
-def insert_user_chat_history(user_id: int, user_chat_history_path: str):
-
-    if not user_id or not user_chat_history_path:
-        raise ValueError(
-            f"Required parameter 'user_id' or 'user_chat_history_path' is missing"
-        )
-
-    with sqlite3.connect(config.RELATIONAL_DB_NAME) as conn:
-        cur = conn.cursor()
-        cur.execute(
-            """INSERT INTO user_chat_history (user_id, chat_json_path) values (?, ?) """,
-            (user_id, user_chat_history_path),
-        )
-        conn.commit()
-        cur.close()
-    return user_chat_history_path
-
-
 def is_username_available(username: str) -> bool:
     is_available = True
-    with sqlite3.connect(config.RELATIONAL_DB_NAME) as conn:
+    with _connection() as conn:
         cur = conn.cursor()
 
         cur.execute(
@@ -54,7 +40,7 @@ def is_username_available(username: str) -> bool:
 
 def get_user(username: str) -> dict | None:
     user = None
-    with sqlite3.connect(config.RELATIONAL_DB_NAME) as conn:
+    with _connection() as conn:
         cur = conn.cursor()
         cur.execute(
             "SELECT user_id, username, password_hash FROM accounts WHERE username = ? LIMIT 1",
@@ -67,17 +53,291 @@ def get_user(username: str) -> dict | None:
     return user
 
 
-def get_user_chat_history(user_id) -> str | None:
-    chat_history_json_path = None
-    with sqlite3.connect(config.RELATIONAL_DB_NAME) as conn:
+def insert_user_document(user_id: int, document_hash_id: str):
+
+    if not user_id or not document_hash_id:
+        raise ValueError(
+            f"Required parameter 'user_id' or 'document_hash_id' is missing"
+        )
+
+    with _connection() as conn:
         cur = conn.cursor()
+        cur.execute(
+            """INSERT OR IGNORE INTO user_documents (user_id, document_hash_id) values (?, ?)""",
+            (user_id, document_hash_id),
+        )
+        conn.commit()
+        cur.close()
+    return document_hash_id
 
+
+def get_user_document_hashes(user_id: int, document_hash_ids: list[str]) -> list[str]:
+    owned_document_hash_ids = []
+    if not document_hash_ids:
+        return owned_document_hash_ids
+    placeholders = ", ".join("?" for _ in document_hash_ids)
+    with _connection() as conn:
+        cur = conn.cursor()
         cur.execute(
-            "SELECT chat_json_path FROM user_chat_history WHERE user_id = ? LIMIT 1",
-            (user_id,),
+            f"SELECT document_hash_id FROM user_documents WHERE user_id = ? AND document_hash_id IN ({placeholders})",
+            (user_id, *document_hash_ids),
+        )
+        owned_document_hash_ids = [row[0] for row in cur.fetchall()]
+        cur.close()
+    return owned_document_hash_ids
+
+
+def upsert_document_status(document_hash_id: str, status: str, chunk_count: int = 0):
+
+    with _connection() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """INSERT INTO documents (document_hash_id, status, chunk_count) values (?, ?, ?)
+            ON CONFLICT (document_hash_id) DO UPDATE SET
+                status = excluded.status,
+                chunk_count = excluded.chunk_count,
+                updated_at = CURRENT_TIMESTAMP""",
+            (document_hash_id, status, chunk_count),
+        )
+        conn.commit()
+        cur.close()
+    return document_hash_id
+
+
+def get_document_status(document_hash_id: str) -> str | None:
+    status = None
+    with _connection() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            "SELECT status FROM documents WHERE document_hash_id = ? LIMIT 1",
+            (document_hash_id,),
+        )
+        result = cur.fetchone()
+        if result:
+            status = result[0]
+        cur.close()
+    return status
+
+
+def get_document_statuses(document_hash_ids: list[str]) -> dict[str, str]:
+    if not document_hash_ids:
+        return {}
+    placeholders = ", ".join("?" for _ in document_hash_ids)
+    with _connection() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            f"SELECT document_hash_id, status FROM documents WHERE document_hash_id IN ({placeholders})",
+            tuple(document_hash_ids),
+        )
+        statuses = {row[0]: row[1] for row in cur.fetchall()}
+        cur.close()
+    return statuses
+
+
+def upsert_session(session_id: str, user_id: int, data: str, last_active_at: float):
+
+    with _connection() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """INSERT INTO sessions (session_id, user_id, data, last_active_at) values (?, ?, ?, ?)
+            ON CONFLICT (session_id) DO UPDATE SET
+                data = excluded.data,
+                last_active_at = excluded.last_active_at""",
+            (session_id, user_id, data, last_active_at),
+        )
+        conn.commit()
+        cur.close()
+    return session_id
+
+
+def get_session(session_id: str) -> str | None:
+    data = None
+    with _connection() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            "SELECT data FROM sessions WHERE session_id = ? LIMIT 1",
+            (session_id,),
         )
         result = cur.fetchone()
         if result:
-            chat_history_json_path = result[0]
+            data = result[0]
         cur.close()
-    return chat_history_json_path
+    return data
+
+
+def touch_session(session_id: str, last_active_at: float):
+
+    with _connection() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            "UPDATE sessions SET last_active_at = ? WHERE session_id = ?",
+            (last_active_at, session_id),
+        )
+        conn.commit()
+        cur.close()
+
+
+def delete_session(session_id: str) -> str | None:
+    # RETURNING lets exactly one worker claim a session that several try to evict
+    data = None
+    with _connection() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            "DELETE FROM sessions WHERE session_id = ? RETURNING data",
+            (session_id,),
+        )
+        result = cur.fetchone()
+        if result:
+            data = result[0]
+        conn.commit()
+        cur.close()
+    return data
+
+
+def get_user_session_ids(user_id: int) -> list[str]:
+    session_ids = []
+    with _connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT session_id FROM sessions WHERE user_id = ?", (user_id,))
+        session_ids = [row[0] for row in cur.fetchall()]
+        cur.close()
+    return session_ids
+
+
+def get_idle_session_ids(last_active_before: float) -> list[str]:
+    session_ids = []
+    with _connection() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            "SELECT session_id FROM sessions WHERE last_active_at < ?",
+            (last_active_before,),
+        )
+        session_ids = [row[0] for row in cur.fetchall()]
+        cur.close()
+    return session_ids
+
+
+def count_sessions() -> int:
+    with _connection() as conn:
+        (count,) = conn.execute("SELECT COUNT(*) FROM sessions").fetchone()
+    return count
+
+
+def upsert_ingestion_job(job_id: str, user_id: int, status: str, data: str):
+
+    with _connection() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """INSERT INTO ingestion_jobs (job_id, user_id, status, data) values (?, ?, ?, ?)
+            ON CONFLICT (job_id) DO UPDATE SET
+                status = excluded.status,
+                data = excluded.data,
+                updated_at = CURRENT_TIMESTAMP""",
+            (job_id, user_id, status, data),
+        )
+        conn.commit()
+        cur.close()
+    return job_id
+
+
+def get_ingestion_job(job_id: str, user_id: int) -> str | None:
+    data = None
+    with _connection() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            "SELECT data FROM ingestion_jobs WHERE job_id = ? AND user_id = ? LIMIT 1",
+            (job_id, user_id),
+        )
+        result = cur.fetchone()
+        if result:
+            data = result[0]
+        cur.close()
+    return data
+
+
+def delete_finished_ingestion_jobs(statuses: list[str], keep: int):
+    """Deletes all but the `keep` most recently updated jobs in the given statuses."""
+
+    placeholders = ", ".join("?" for _ in statuses)
+    with _connection() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            f"""DELETE FROM ingestion_jobs WHERE job_id IN (
+                SELECT job_id FROM ingestion_jobs WHERE status IN ({placeholders})
+                ORDER BY updated_at DESC LIMIT -1 OFFSET ?
+            )""",
+            (*statuses, keep),
+        )
+        conn.commit()
+        cur.close()
+
+
+def get_all_user_chat_histories() -> list[tuple[int, str]]:
+    with _connection() as conn:
+        return conn.execute(
+            "SELECT user_id, chat_json_path FROM user_chat_history"
+        ).fetchall()
+
+
+def insert_chat_messages(user_id: int, messages: list[tuple[str, str]]):
+    """Appends (message_id, message_json) rows to the user's conversation."""
+
+    with _connection() as conn:
+        cur = conn.cursor()
+        cur.executemany(
+            """INSERT OR IGNORE INTO chat_messages (message_id, user_id, message) values (?, ?, ?)""",
+            [(message_id, user_id, message) for message_id, message in messages],
+        )
+        conn.commit()
+        cur.close()
+
+
+def get_chat_message_seq(user_id: int, message_id: str) -> int | None:
+    seq = None
+    with _connection() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            "SELECT seq FROM chat_messages WHERE user_id = ? AND message_id = ? LIMIT 1",
+            (user_id, message_id),
+        )
+        result = cur.fetchone()
+        if result:
+            seq = result[0]
+        cur.close()
+    return seq
+
+
+def get_chat_messages_before(
+    user_id: int, limit: int, before_seq: int | None = None
+) -> list[tuple[int, str]]:
+    """Newest messages first, optionally older than before_seq."""
+
+    with _connection() as conn:
+        return conn.execute(
+            """SELECT seq, message FROM chat_messages
+            WHERE user_id = ? AND seq < ?
+            ORDER BY seq DESC LIMIT ?""",
+            (user_id, before_seq if before_seq is not None else 2**63 - 1, limit),
+        ).fetchall()
+
+
+def get_chat_messages_after(
+    user_id: int, limit: int, after_seq: int
+) -> list[tuple[int, str]]:
+    """Oldest messages first, newer than after_seq."""
+
+    with _connection() as conn:
+        return conn.execute(
+            """SELECT seq, message FROM chat_messages
+            WHERE user_id = ? AND seq > ?
+            ORDER BY seq ASC LIMIT ?""",
+            (user_id, after_seq, limit),
+        ).fetchall()
+
+
+def user_has_chat_messages(user_id: int) -> bool:
+    with _connection() as conn:
+        row = conn.execute(
+            "SELECT 1 FROM chat_messages WHERE user_id = ? LIMIT 1", (user_id,)
+        ).fetchone()
+    return row is not None
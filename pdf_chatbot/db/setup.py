@@ -1,30 +1,16 @@
 import sqlite3
 from pdf_chatbot import config
-from pathlib import Path
-from pdf_chatbot.user.account import hash_password
-import json
+from pdf_chatbot.db.connection_pool import SQLiteConnectionPool
+from pdf_chatbot.user.password_hasher import hash_password
 
 default_users = [
     (1, "demo", hash_password("demo_password")),
 ]
-default_chat_history = [
-    (1, ".chat_history/user_1.json"),
-]
-
-
-def setup_chat_history():
-
-    for chat_history_obj in default_chat_history:
-        user_chat_history_path = chat_history_obj[1]
-        file_path = Path(user_chat_history_path)
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(file_path, "w") as chat_file:
-            json.dump([], chat_file)
 
 
 def initialize_db():
 
-    with sqlite3.connect(config.RELATIONAL_DB_NAME) as conn:
+    with SQLiteConnectionPool.get_instance(config.RELATIONAL_DB_NAME).connection() as conn:
         conn: sqlite3.Connection
 
         cursor = conn.cursor()
@@ -39,6 +25,7 @@ def initialize_db():
             """
         )
 
+        # Legacy per-user JSON history files, kept for migrate_chat_history_files
         cursor.execute(
             """CREATE TABLE IF NOT EXISTS user_chat_history(
             user_id INTEGER PRIMARY KEY,
@@ -51,18 +38,91 @@ def initialize_db():
             """
         )
 
+        cursor.execute(
+            """CREATE TABLE IF NOT EXISTS documents(
+            document_hash_id TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            chunk_count INTEGER DEFAULT 0,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+        )
+
+        cursor.execute(
+            """CREATE TABLE IF NOT EXISTS user_documents(
+            user_id INTEGER NOT NULL,
+            document_hash_id TEXT NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, document_hash_id),
+            FOREIGN KEY (user_id) REFERENCES accounts (user_id)
+                    ON DELETE CASCADE
+                    ON UPDATE CASCADE
+            )
+            """
+        )
+
+        # Append-only conversation log; seq orders messages, message_id is the public id
+        cursor.execute(
+            """CREATE TABLE IF NOT EXISTS chat_messages(
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            message_id TEXT UNIQUE NOT NULL,
+            user_id INTEGER NOT NULL,
+            message TEXT NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES accounts (user_id)
+                    ON DELETE CASCADE
+                    ON UPDATE CASCADE
+            )
+            """
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_chat_messages_user ON chat_messages (user_id, seq)"
+        )
+
+        cursor.execute(
+            """CREATE TABLE IF NOT EXISTS sessions(
+            session_id TEXT PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            data TEXT NOT NULL,
+            last_active_at REAL NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES accounts (user_id)
+                    ON DELETE CASCADE
+                    ON UPDATE CASCADE
+            )
+            """
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_sessions_user ON sessions (user_id)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_sessions_last_active ON sessions (last_active_at)"
+        )
+
+        # Ingestion jobs as JSON, so any API worker can answer a status poll
+        cursor.execute(
+            """CREATE TABLE IF NOT EXISTS ingestion_jobs(
+            job_id TEXT PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            data TEXT NOT NULL,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES accounts (user_id)
+                    ON DELETE CASCADE
+                    ON UPDATE CASCADE
+            )
+            """
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_ingestion_jobs_status ON ingestion_jobs (status, updated_at)"
+        )
+
         cursor.executemany(
             """INSERT OR IGNORE INTO accounts (user_id, username, password_hash) VALUES (?, ?, ?)""",
             default_users,
         )
-        cursor.executemany(
-            """INSERT OR IGNORE INTO user_chat_history (user_id, chat_json_path) VALUES (?, ?)""",
-            default_chat_history,
-        )
         conn.commit()
         cursor.close()
 
 
 if __name__ == "__main__":
-    setup_chat_history()
     initialize_db()
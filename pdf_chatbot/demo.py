@@ -1,14 +1,27 @@
-from pdf_chatbot.db import setup
+from pdf_chatbot.db import setup, migrations
 from pdf_chatbot.chat.gradio_chat_ui import create_gradio_chat_interface
+from pdf_chatbot.documents.conversion_pool import conversion_pool
+from pdf_chatbot.model_registry import model_registry
+from pdf_chatbot.user.password_hasher import password_hasher
+from pdf_chatbot import config
 import os
 
 port = int(os.getenv("PORT", 8080))
 server = "0.0.0.0"
 
-setup.setup_chat_history()
-setup.initialize_db()
 
+if __name__ == "__main__":
+    # Guarded so spawned document conversion workers don't relaunch the UI
+    setup.initialize_db()
+    migrations.migrate_chat_history_files()
+    migrations.migrate_to_shared_document_chunks()
+    model_registry.warmup(parallel=config.MODEL_WARMUP_PARALLEL)
 
-gradio_app = create_gradio_chat_interface()
-gradio_app.queue(default_concurrency_limit=10)
-gradio_app.launch(server_name=server, server_port=port)
+    gradio_app = create_gradio_chat_interface()
+    gradio_app.queue(default_concurrency_limit=10)
+    try:
+        gradio_app.launch(server_name=server, server_port=port)
+    finally:
+        conversion_pool.shutdown()
+        # Warmed with the other registered components, so stop its workers too
+        password_hasher.shutdown()
@@ -0,0 +1,113 @@
+from langchain_text_splitters import (
+    MarkdownHeaderTextSplitter,
+    RecursiveCharacterTextSplitter,
+)
+from langchain_core.documents import Document
+from pdf_chatbot.errors.document_error import DocumentChunkingError
+from pdf_chatbot.model_registry import model_registry
+from pdf_chatbot import config
+
+CHUNKING_MODE_HEADERS = "markdown_headers"
+CHUNKING_MODE_TOKEN_BOUNDED = "token_bounded"
+
+# Identifies the chunking strategy in cached chunk lists
+if config.CHUNKING_MODE == CHUNKING_MODE_TOKEN_BOUNDED:
+    CHUNKER_ID = f"token-bounded-v2-{config.CHUNK_MAX_TOKENS}-{config.CHUNK_OVERLAP_TOKENS}"
+else:
+    CHUNKER_ID = "markdown-headers-h1-h2"
+
+_HEADER_KEYS = ["h1", "h2"]
+
+
+def _inherit_headers(metadata: dict, carried_headers: dict) -> dict:
+    # Sections cut by a page-batch boundary continue under the previous headers
+    if "h1" in metadata:
+        return metadata
+    inherited = {"h1": carried_headers["h1"]} if "h1" in carried_headers else {}
+    if "h2" not in metadata and "h2" in carried_headers:
+        inherited["h2"] = carried_headers["h2"]
+    return {**inherited, **metadata}
+
+
+def _load_tokenizer():
+    # Token lengths are measured with the embedding model's own tokenizer
+    from transformers import AutoTokenizer
+
+    return AutoTokenizer.from_pretrained(config.VECTOR_EMBEDDING_MODEL)
+
+
+model_registry.register(
+    "chunking_tokenizer",
+    _load_tokenizer,
+    warmup=config.CHUNKING_MODE == CHUNKING_MODE_TOKEN_BOUNDED,
+)
+
+
+def _get_tokenizer():
+    return model_registry.get("chunking_tokenizer")
+
+
+def _split_to_token_budget(
+    sections: list[Document], max_tokens: int, overlap_tokens: int
+) -> list[Document]:
+
+    tokenizer = _get_tokenizer()
+    # The model's window also holds the special tokens ([CLS], [SEP]) it adds
+    max_tokens -= tokenizer.num_special_tokens_to_add()
+    bounded_chunks = []
+    for section in sections:
+        headers = [section.metadata[key] for key in _HEADER_KEYS if key in section.metadata]
+        # The breadcrumb is prepended later, so it shares the token budget;
+        # the "\n\n" joining it is whitespace and adds no tokens
+        breadcrumb_tokens = len(tokenizer.tokenize(" > ".join(headers))) if headers else 0
+        chunk_size = max(max_tokens - breadcrumb_tokens, overlap_tokens + 1)
+        splitter = RecursiveCharacterTextSplitter.from_huggingface_tokenizer(
+            tokenizer, chunk_size=chunk_size, chunk_overlap=overlap_tokens
+        )
+        bounded_chunks.extend(
+            Document(page_content=text, metadata=dict(section.metadata))
+            for text in splitter.split_text(section.page_content)
+        )
+    return bounded_chunks
+
+
+def chunk_markdown(
+    markdown: str, carried_headers: dict | None = None
+) -> tuple[list[Document], dict]:
+    """
+    Splits markdown on h1/h2 headers and prefixes each chunk with its header
+    breadcrumb. In token-bounded mode each section is further split so no
+    chunk encodes to more than CHUNK_MAX_TOKENS (breadcrumb and special
+    tokens included), with CHUNK_OVERLAP_TOKENS of overlap. When chunking a
+    document in page batches, pass the headers returned for the previous
+    batch as carried_headers.
+    """
+
+    carried_headers = carried_headers or {}
+    splitter = MarkdownHeaderTextSplitter(
+        headers_to_split_on=[("#", "h1"), ("##", "h2")]
+    )
+    try:
+        chunks = splitter.split_text(markdown)
+        for chunk in chunks:
+            chunk.metadata = _inherit_headers(chunk.metadata, carried_headers)
+        if config.CHUNKING_MODE == CHUNKING_MODE_TOKEN_BOUNDED:
+            chunks = _split_to_token_budget(
+                chunks, config.CHUNK_MAX_TOKENS, config.CHUNK_OVERLAP_TOKENS
+            )
+    except Exception:
+        raise DocumentChunkingError(
+            "Failed to chunk the document content. Please check the file uploaded"
+        )
+    for chunk in chunks:
+        headers = [chunk.metadata[key] for key in _HEADER_KEYS if key in chunk.metadata]
+        if headers:
+            chunk.page_content = (" > ".join(headers)) + "\n\n" + chunk.page_content
+
+    if chunks:
+        carried_headers = {
+            key: chunks[-1].metadata[key]
+            for key in _HEADER_KEYS
+            if key in chunks[-1].metadata
+        }
+    return chunks, carried_headers
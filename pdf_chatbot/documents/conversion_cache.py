@@ -0,0 +1,166 @@
+from langchain_core.documents import Document
+from pathlib import Path
+from typing import Iterator
+from pdf_chatbot import config
+import threading
+import shutil
+import json
+import os
+
+
+class ConversionCacheWriter:
+    """
+    Streams one document's markdown and chunks into the cache as they are
+    produced. Nothing becomes visible to readers until commit().
+    """
+
+    def __init__(self, cache: "ConversionCache", document_hash_id: str, chunker_id: str):
+        self.cache = cache
+        self.markdown_path = cache._markdown_path(document_hash_id)
+        self.chunks_path = cache._chunks_path(document_hash_id, chunker_id)
+        self.markdown_path.parent.mkdir(parents=True, exist_ok=True)
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        self._markdown_tmp = self.markdown_path.with_name(self.markdown_path.name + suffix)
+        self._chunks_tmp = self.chunks_path.with_name(self.chunks_path.name + suffix)
+        self._markdown_file = open(self._markdown_tmp, "w", encoding="utf-8")
+        self._chunks_file = open(self._chunks_tmp, "w", encoding="utf-8")
+
+    def append_markdown(self, markdown: str) -> None:
+        # One page batch per line, so a replay keeps the same batch bounds
+        self._markdown_file.write(json.dumps(markdown))
+        self._markdown_file.write("\n")
+
+    def append_chunks(self, chunks: list[Document]) -> None:
+        for chunk in chunks:
+            self._chunks_file.write(
+                json.dumps({"page_content": chunk.page_content, "metadata": chunk.metadata})
+            )
+            self._chunks_file.write("\n")
+
+    def commit(self, include_markdown: bool = True) -> None:
+        self._markdown_file.close()
+        self._chunks_file.close()
+        if include_markdown:
+            os.replace(self._markdown_tmp, self.markdown_path)
+        else:
+            self._markdown_tmp.unlink(missing_ok=True)
+        os.replace(self._chunks_tmp, self.chunks_path)
+        self.cache._evict()
+
+    def abort(self) -> None:
+        self._markdown_file.close()
+        self._chunks_file.close()
+        self._markdown_tmp.unlink(missing_ok=True)
+        self._chunks_tmp.unlink(missing_ok=True)
+
+
+class ConversionCache:
+    """
+    On-disk, content-addressed cache of converted markdown and chunk lists,
+    keyed by the document's SHA-256 hash and shared across users. Entries
+    are evicted least-recently-used once the cache exceeds max_size_mb.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path = config.CONVERSION_CACHE_DIR,
+        max_size_mb: int = config.CONVERSION_CACHE_MAX_SIZE_MB,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_dir(self, document_hash_id: str) -> Path:
+        return self.cache_dir / document_hash_id
+
+    def _markdown_path(self, document_hash_id: str) -> Path:
+        return self._entry_dir(document_hash_id) / "markdown.jsonl"
+
+    def _chunks_path(self, document_hash_id: str, chunker_id: str) -> Path:
+        return self._entry_dir(document_hash_id) / f"chunks.{chunker_id}.jsonl"
+
+    def _touch(self, path: Path) -> bool:
+        try:
+            # Entry directory mtime doubles as the LRU timestamp
+            os.utime(path.parent)
+            exists = path.is_file()
+        except FileNotFoundError:
+            exists = False
+        if exists:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return exists
+
+    def iter_markdown_batches(self, document_hash_id: str) -> Iterator[str] | None:
+        """The cached markdown, one page batch at a time, as it was converted."""
+        path = self._markdown_path(document_hash_id)
+        if not self._touch(path):
+            return None
+        try:
+            markdown_file = open(path, "r", encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+        def batches():
+            with markdown_file:
+                for line in markdown_file:
+                    yield json.loads(line)
+
+        return batches()
+
+    def iter_chunk_batches(
+        self, document_hash_id: str, chunker_id: str, batch_size: int
+    ) -> Iterator[list[Document]] | None:
+        path = self._chunks_path(document_hash_id, chunker_id)
+        if not self._touch(path):
+            return None
+        try:
+            chunks_file = open(path, "r", encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+        def batches():
+            with chunks_file:
+                batch = []
+                for line in chunks_file:
+                    chunk = json.loads(line)
+                    batch.append(
+                        Document(page_content=chunk["page_content"], metadata=chunk["metadata"])
+                    )
+                    if len(batch) >= batch_size:
+                        yield batch
+                        batch = []
+                if batch:
+                    yield batch
+
+        return batches()
+
+    def writer(self, document_hash_id: str, chunker_id: str) -> ConversionCacheWriter:
+        return ConversionCacheWriter(self, document_hash_id, chunker_id)
+
+    def _evict(self) -> None:
+        with self._lock:
+            entries = []
+            total_size = 0
+            for entry_dir in self.cache_dir.iterdir():
+                if not entry_dir.is_dir():
+                    continue
+                size = sum(f.stat().st_size for f in entry_dir.iterdir() if f.is_file())
+                entries.append((entry_dir.stat().st_mtime, size, entry_dir))
+                total_size += size
+
+            entries.sort()
+            for _, size, entry_dir in entries:
+                if total_size <= self.max_size_bytes:
+                    break
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                total_size -= size
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+conversion_cache = ConversionCache()
@@ -0,0 +1,144 @@
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from docling.document_converter import DocumentConverter
+from docling.datamodel.base_models import DocumentStream, InputFormat
+from pdf_chatbot.errors.document_error import DocumentConversionError
+from pdf_chatbot.model_registry import model_registry
+from pdf_chatbot import config
+from io import BytesIO
+from pathlib import Path
+import multiprocessing
+import threading
+import asyncio
+import os
+
+# Per-process converter, initialized once when a pool worker starts
+_worker_converter: DocumentConverter | None = None
+
+
+def _initialize_worker():
+    global _worker_converter
+    _worker_converter = DocumentConverter()
+    _worker_converter.initialize_pipeline(InputFormat.PDF)
+
+
+def _warm_worker() -> int:
+    return os.getpid()
+
+
+def _convert_in_worker(
+    source: bytes | Path, page_range: tuple[int, int] | None = None
+) -> str:
+    try:
+        if isinstance(source, Path):
+            # Spooled uploads are read from disk by the worker, not pickled across
+            doc = source
+        else:
+            doc = DocumentStream(name="sample.pdf", stream=BytesIO(source))
+        if page_range:
+            result = _worker_converter.convert(source=doc, page_range=page_range)
+        else:
+            result = _worker_converter.convert(source=doc)
+        markdown = result.document.export_to_markdown()
+    except Exception:
+        raise DocumentConversionError(
+            "Failed to extract PDF content for the files passed. Please check the file uploaded"
+        )
+    return markdown
+
+
+class ConversionPool:
+    """
+    Process pool of warm Docling workers converting a PDF, given as bytes
+    or a file path, (optionally a 1-based inclusive page range of it) to
+    markdown.
+    Keeps layout analysis off the event loop's GIL, bounds the number of
+    conversions queued on the pool, and recycles each worker after
+    max_tasks_per_worker tasks to cap memory growth. Every page batch and
+    warmup call is a task, so a large document may span several workers.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = config.CONVERSION_POOL_WORKERS,
+        max_pending: int = config.CONVERSION_POOL_MAX_PENDING,
+        max_tasks_per_worker: int = config.CONVERSION_WORKER_MAX_TASKS,
+    ):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self._executor: ProcessPoolExecutor | None = None
+        self._executor_lock = threading.Lock()
+        self._slots = asyncio.Semaphore(max_workers + max_pending)
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+
+    def start(self) -> ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_initialize_worker,
+                    max_tasks_per_child=self.max_tasks_per_worker,
+                )
+            return self._executor
+
+    def warmup(self) -> "ConversionPool":
+        # Blocks until every worker has started and initialized its converter
+        executor = self.start()
+        futures = [executor.submit(_warm_worker) for _ in range(self.max_workers)]
+        wait(futures)
+        for future in futures:
+            future.result()
+        return self
+
+    async def convert(
+        self, source: bytes | Path, page_range: tuple[int, int] | None = None
+    ) -> str:
+        async with self._slots:
+            executor = self.start()
+            loop = asyncio.get_running_loop()
+            self.in_flight += 1
+            try:
+                markdown = await loop.run_in_executor(
+                    executor, _convert_in_worker, source, page_range
+                )
+            except BrokenProcessPool as e:
+                self.failed += 1
+                self._discard_executor(executor)
+                raise DocumentConversionError(
+                    "Document conversion worker crashed. Please retry the upload"
+                ) from e
+            except DocumentConversionError:
+                self.failed += 1
+                raise
+            finally:
+                self.in_flight -= 1
+            self.completed += 1
+            return markdown
+
+    def _discard_executor(self, executor: ProcessPoolExecutor) -> None:
+        with self._executor_lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+
+conversion_pool = ConversionPool()
+model_registry.register("document_converter", conversion_pool.warmup)
@@ -1,52 +1,36 @@
-from docling.document_converter import DocumentConverter
-from docling.datamodel.base_models import DocumentStream
-from langchain_text_splitters import MarkdownHeaderTextSplitter
-from langchain_core.documents import Document
 from pdf_chatbot.rag.vector_store import VectorStore
+from pdf_chatbot.rag.lexical_index import LexicalIndex
+from pdf_chatbot.rag.retriever_cache import retriever_cache
+from pdf_chatbot.documents.ingestion_pipeline import ingest_document
+from pdf_chatbot.documents.upload import SpooledUpload
 from pdf_chatbot.errors.document_error import (
-    DocumentConversionError,
-    DocumentChunkingError,
+    DocumentNotFoundError,
     InvalidDocumentError,
 )
+from pdf_chatbot.schemas.document import DocumentStatus
+from pdf_chatbot.scheduler import Priority
 from pdf_chatbot import config
+from pdf_chatbot.db import repository, async_repository
 import hashlib
 from typing import Union
-from io import BytesIO
+import weakref
 import asyncio
 
 vector_store: VectorStore = VectorStore.get_instance()
-doc_converter = DocumentConverter()
-
-
-def _convert_to_markdown(file_content: bytes) -> str:
-    try:
-        pdf_file = BytesIO(file_content)
-        pdf_file.name = "sample.pdf"
-        doc = DocumentStream(name=pdf_file.name, stream=pdf_file)
-        result = doc_converter.convert(source=doc)
-        markdown = result.document.export_to_markdown()
-    except Exception:
-        raise DocumentConversionError(
-            "Failed to extract PDF content for the files passed. Please check the file uploaded"
-        )
-    return markdown
+lexical_index: LexicalIndex = LexicalIndex.get_instance()
 
+# One ingestion per document at a time, shared by every user uploading it
+_document_locks: weakref.WeakValueDictionary[str, asyncio.Lock] = (
+    weakref.WeakValueDictionary()
+)
 
-def _chunk_mardown_doc(markdown: str) -> list[Document]:
-    splitter = MarkdownHeaderTextSplitter(
-        headers_to_split_on=[("#", "h1"), ("##", "h2")]
-    )
-    try:
-        chunks = splitter.split_text(markdown)
-    except Exception:
-        raise DocumentChunkingError(
-            "Failed to chunk the document content. Please check the file uploaded"
-        )
-    for chunk in chunks:
-        headers = [chunk.metadata[key] for key in ["h1", "h2"] if key in chunk.metadata]
-        if headers:
-            chunk.page_content = (" > ".join(headers)) + "\n\n" + chunk.page_content
-    return chunks
+
+def _document_lock(document_hash_id: str) -> asyncio.Lock:
+    lock = _document_locks.get(document_hash_id)
+    if lock is None:
+        lock = asyncio.Lock()
+        _document_locks[document_hash_id] = lock
+    return lock
 
 
 def generate_hash(content: Union[bytes, str]) -> str:
@@ -55,66 +39,129 @@ def generate_hash(content: Union[bytes, str]) -> str:
     return hashlib.sha256(content).hexdigest()
 
 
-async def _process_individual_document(file: bytes, user_id: int) -> str:
+def get_document_hash(file: bytes | SpooledUpload) -> str:
+    # Spooled uploads were hashed incrementally while they streamed in
+    if isinstance(file, SpooledUpload):
+        return file.document_hash_id
+    return generate_hash(content=file)
 
-    document_hash_id = generate_hash(content=file)
 
-    def document_alread_processed():
-        return vector_store.document_exists(
-            metadata_filter={
-                "$and": [
-                    {"user_id": user_id},
-                    {"document_hash_id": document_hash_id},
-                ]
-            }
-        )
+def _is_document_ready(document_hash_id: str) -> bool:
 
-    if await asyncio.to_thread(document_alread_processed):
-        return document_hash_id
-
-    markdown = await asyncio.to_thread(_convert_to_markdown, file)
-    chunks: list[Document] = await asyncio.to_thread(_chunk_mardown_doc, markdown)
-
-    ids, page_contents, metadatas = [], [], []
-    for i, chunk in enumerate(chunks):
-        ids.append(f"{user_id}:{document_hash_id}:{i}:")
-        page_contents.append(chunk.page_content)
-        metadatas.append(
-            {
-                **chunk.metadata,
-                "user_id": user_id,
-                "document_hash_id": document_hash_id,
-                "chunk_id": f"{user_id}:{document_hash_id}:{i}",
-                "source_file": "NA",  # To be updated when we start saving user files on server
-                "chunk_content": chunk.page_content,
-            }
-        )
-    await asyncio.to_thread(vector_store.add, ids, page_contents, metadatas)
-    return document_hash_id
+    status = repository.get_document_status(document_hash_id)
+    if status:
+        return status == DocumentStatus.READY
+    # Documents ingested before status tracking only exist in the vector store
+    if vector_store.document_exists(metadata_filter={"document_hash_id": document_hash_id}):
+        repository.upsert_document_status(document_hash_id, DocumentStatus.READY)
+        return True
+    return False
 
 
-async def save_user_documents(files: list[bytes], user_id: int) -> list[str]:
+def _backfill_lexical_index(document_hash_id: str):
+    # Documents ingested before the lexical index existed are indexed on first reuse
+    if lexical_index.document_exists(document_hash_id):
+        return
+    chunk_ids, page_contents = vector_store.get_document_records(
+        {"document_hash_id": document_hash_id}
+    )
+    lexical_index.add(document_hash_id, chunk_ids, page_contents)
+
+
+async def grant_user_access(user_id: int, document_hash_id: str):
+    await async_repository.insert_user_document(user_id, document_hash_id)
+    retriever_cache.invalidate(user_id=user_id, document_hash_id=document_hash_id)
+
 
-    document_ingestion_semaphore = asyncio.Semaphore(2)
+async def _process_individual_document(
+    file: bytes | SpooledUpload,
+    user_id: int,
+    document_hash_id: str | None = None,
+    priority: Priority = Priority.BULK,
+) -> str:
 
-    async def guarded_doument_ingestion_process(file):
-        async with document_ingestion_semaphore:
-            return await _process_individual_document(file, user_id)
+    document_hash_id = document_hash_id or get_document_hash(file)
+    source = file.path if isinstance(file, SpooledUpload) else file
 
+    async with _document_lock(document_hash_id):
+
+        # Chunks are stored once per document and shared by every user who owns it
+        if await asyncio.to_thread(_is_document_ready, document_hash_id):
+            await asyncio.to_thread(_backfill_lexical_index, document_hash_id)
+            await grant_user_access(user_id, document_hash_id)
+            return document_hash_id
+
+        # Granted up front so batches are searchable by the uploader as they land
+        await grant_user_access(user_id, document_hash_id)
+        await async_repository.upsert_document_status(
+            document_hash_id, DocumentStatus.PROCESSING
+        )
+        try:
+            chunk_count = await ingest_document(source, document_hash_id, priority)
+        except Exception:
+            await async_repository.upsert_document_status(
+                document_hash_id, DocumentStatus.FAILED
+            )
+            raise
+        await async_repository.upsert_document_status(
+            document_hash_id, DocumentStatus.READY, chunk_count
+        )
+    return document_hash_id
+
+
+async def save_user_documents(
+    files: list[bytes | SpooledUpload], user_id: int
+) -> list[str]:
+
+    # Uploaded with a chat turn, so the user is waiting on them; concurrency
+    # is bounded process-wide by the scheduler's conversion and embedding pools
     document_hash_list = await asyncio.gather(
-        *(guarded_doument_ingestion_process(file) for file in files)
+        *(
+            _process_individual_document(file, user_id, priority=Priority.INTERACTIVE)
+            for file in files
+        )
     )
     return document_hash_list
 
 
-def verify_user_documents(files: list[bytes]):
+async def save_user_document(
+    file: bytes | SpooledUpload, user_id: int, document_hash_id: str | None = None
+) -> str:
+    return await _process_individual_document(file, user_id, document_hash_id)
+
+
+def get_active_user_documents(user_id: int, document_hash_ids: list[str]) -> list[str]:
+    """
+    Validates documents referenced by hash for a chat turn. Every document must
+    be owned by the user and not have failed ingestion; documents still
+    processing are allowed and searchable as their chunks land.
+    """
+
+    document_hash_ids = list(dict.fromkeys(document_hash_ids))
+    owned_document_hash_ids = set(
+        repository.get_user_document_hashes(user_id, document_hash_ids)
+    )
+    for document_hash_id in document_hash_ids:
+        if document_hash_id not in owned_document_hash_ids:
+            raise DocumentNotFoundError(
+                f"Document '{document_hash_id}' was not found. Please upload it first"
+            )
+        if repository.get_document_status(document_hash_id) == DocumentStatus.FAILED:
+            raise InvalidDocumentError(
+                f"Document '{document_hash_id}' failed to process. Please upload it again"
+            )
+    return document_hash_ids
+
+
+def verify_user_documents(files: list[bytes | SpooledUpload]):
 
-    if len(files) > 3:
+    if len(files) > config.MAX_FILES_PER_REQUEST:
         raise InvalidDocumentError(
-            "Too many files uploaded. Maximum of 3 files allowed."
+            f"Too many files uploaded. Maximum of {config.MAX_FILES_PER_REQUEST} files allowed."
         )
     for file in files:
-        if len(file) > (config.MAX_FILE_SIZE_MB * 1024 * 1024):
+        size = file.size if isinstance(file, SpooledUpload) else len(file)
+        if size > (config.MAX_FILE_SIZE_MB * 1024 * 1024):
             raise InvalidDocumentError(
                 f"File exceeds maximum allowed size ({config.MAX_FILE_SIZE_MB} MB)"
             )
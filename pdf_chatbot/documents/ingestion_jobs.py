@@ -0,0 +1,100 @@
+from datetime import datetime
+from pdf_chatbot.db import async_repository
+from pdf_chatbot.documents.document_processor import (
+    get_document_hash,
+    grant_user_access,
+    save_user_document,
+    verify_user_documents,
+)
+from pdf_chatbot.documents.upload import SpooledUpload
+from pdf_chatbot.errors.base import PDFChatbotError
+from pdf_chatbot.scheduler import scheduler
+from pdf_chatbot.schemas.document import IngestionJob, IngestionJobStatus
+from pdf_chatbot import config
+import asyncio
+import uuid
+
+
+class _IngestionJobManager:
+    """
+    Tracks documents uploaded through the documents API and ingests them in
+    background tasks, so uploads return a job id immediately. Spooled
+    uploads are owned by the job and removed once it finishes.
+    Jobs are persisted in SQLite, so a status poll can land on any API
+    worker; only the most recent INGESTION_JOBS_MAX_TRACKED finished jobs
+    are kept.
+    """
+
+    def __init__(self, max_tracked_jobs: int = config.INGESTION_JOBS_MAX_TRACKED):
+        self.max_tracked_jobs = max_tracked_jobs
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(
+        self, user_id: int, file: bytes | SpooledUpload, file_name: str | None = None
+    ) -> IngestionJob:
+
+        verify_user_documents(files=[file])
+        scheduler.ensure_capacity("conversion")
+        document_hash_id = get_document_hash(file)
+        # Granted before returning so /chat accepts the hash right away, even
+        # while another ingestion of the same document holds its lock
+        await grant_user_access(user_id, document_hash_id)
+        now = datetime.now()
+        job = IngestionJob(
+            job_id=str(uuid.uuid4()),
+            user_id=user_id,
+            document_hash_id=document_hash_id,
+            file_name=file_name,
+            created_at=now,
+            updated_at=now,
+        )
+        await self._save(job)
+
+        task = asyncio.create_task(self._run(job, file))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def get_job(self, user_id: int, job_id: str) -> IngestionJob | None:
+        data = await async_repository.get_ingestion_job(job_id, user_id)
+        return IngestionJob.model_validate_json(data) if data else None
+
+    async def _save(self, job: IngestionJob):
+        await async_repository.upsert_ingestion_job(
+            job.job_id, job.user_id, job.status, job.model_dump_json()
+        )
+
+    async def _set_status(
+        self, job: IngestionJob, status: IngestionJobStatus, error: str | None = None
+    ):
+        job.status = status
+        job.error = error
+        job.updated_at = datetime.now()
+        await self._save(job)
+
+    async def _run(self, job: IngestionJob, file: bytes | SpooledUpload):
+        try:
+            await self._set_status(job, IngestionJobStatus.PROCESSING)
+            await save_user_document(file, job.user_id, job.document_hash_id)
+        except PDFChatbotError as e:
+            await self._set_status(job, IngestionJobStatus.FAILED, str(e))
+        except Exception as e:
+            print(f"Ingestion job {job.job_id} failed: {e!r}")
+            await self._set_status(
+                job, IngestionJobStatus.FAILED, "Unexpected error while processing the document"
+            )
+        else:
+            await self._set_status(job, IngestionJobStatus.READY)
+        finally:
+            if isinstance(file, SpooledUpload):
+                await asyncio.to_thread(file.cleanup)
+        await self._evict_finished_jobs()
+
+    async def _evict_finished_jobs(self):
+        await async_repository.delete_finished_ingestion_jobs(
+            [IngestionJobStatus.READY, IngestionJobStatus.FAILED],
+            keep=self.max_tracked_jobs,
+        )
+
+
+ingestion_job_manager = _IngestionJobManager()
@@ -0,0 +1,178 @@
+from langchain_core.documents import Document
+from pdf_chatbot.rag.vector_store import VectorStore
+from pdf_chatbot.rag.lexical_index import LexicalIndex
+from pdf_chatbot.documents.chunker import CHUNKER_ID, chunk_markdown
+from pdf_chatbot.documents.conversion_pool import conversion_pool
+from pdf_chatbot.documents.conversion_cache import (
+    ConversionCacheWriter,
+    conversion_cache,
+)
+from pdf_chatbot.errors.document_error import InvalidDocumentError
+from pdf_chatbot.scheduler import Priority, scheduler
+from pdf_chatbot import config
+from pathlib import Path
+import pypdfium2
+import asyncio
+
+vector_store: VectorStore = VectorStore.get_instance()
+lexical_index: LexicalIndex = LexicalIndex.get_instance()
+
+# Marks the end of a stage's output on its queue
+_END_OF_STREAM = None
+
+
+def _count_pages(source: bytes | Path) -> int:
+    try:
+        pdf = pypdfium2.PdfDocument(source)
+    except Exception:
+        raise InvalidDocumentError("Unable to read the uploaded PDF file")
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def _page_ranges(page_count: int, batch_size: int) -> list[tuple[int, int]]:
+    return [
+        (start, min(start + batch_size - 1, page_count))
+        for start in range(1, page_count + 1, batch_size)
+    ]
+
+
+class _IngestionRun:
+    """
+    One document flowing through convert -> chunk -> embed & write stages.
+    Stages are connected by bounded queues, so only a few page batches of a
+    document are held in memory at once and each batch of chunks becomes
+    searchable as soon as it is written.
+    """
+
+    def __init__(
+        self, source: bytes | Path, document_hash_id: str, priority: Priority
+    ):
+        self.source = source
+        self.document_hash_id = document_hash_id
+        self.priority = priority
+        self.markdown_queue: asyncio.Queue[str | None] = asyncio.Queue(
+            maxsize=config.INGESTION_QUEUE_SIZE
+        )
+        self.chunk_queue: asyncio.Queue[list[Document] | None] = asyncio.Queue(
+            maxsize=config.INGESTION_QUEUE_SIZE
+        )
+        self.cache_writer: ConversionCacheWriter | None = None
+        self.chunk_count = 0
+
+    async def _convert_stage(self):
+        page_count = await asyncio.to_thread(_count_pages, self.source)
+        for page_range in _page_ranges(page_count, config.INGESTION_PAGE_BATCH_SIZE):
+            async with scheduler.slot("conversion", self.priority):
+                markdown = await conversion_pool.convert(self.source, page_range)
+            await asyncio.to_thread(self.cache_writer.append_markdown, markdown)
+            await self.markdown_queue.put(markdown)
+        await self.markdown_queue.put(_END_OF_STREAM)
+
+    async def _chunk_stage(self):
+        carried_headers = {}
+        while (markdown := await self.markdown_queue.get()) is not _END_OF_STREAM:
+            chunks, carried_headers = await asyncio.to_thread(
+                chunk_markdown, markdown, carried_headers
+            )
+            await asyncio.to_thread(self.cache_writer.append_chunks, chunks)
+            for start in range(0, len(chunks), config.INGESTION_EMBED_BATCH_SIZE):
+                await self.chunk_queue.put(
+                    chunks[start : start + config.INGESTION_EMBED_BATCH_SIZE]
+                )
+        await self.chunk_queue.put(_END_OF_STREAM)
+
+    async def _cached_chunks_stage(self, chunk_batches):
+        while (batch := await asyncio.to_thread(next, chunk_batches, None)) is not None:
+            await self.chunk_queue.put(batch)
+        await self.chunk_queue.put(_END_OF_STREAM)
+
+    async def _write_stage(self):
+        while (chunks := await self.chunk_queue.get()) is not _END_OF_STREAM:
+            async with scheduler.slot("embedding", self.priority):
+                await asyncio.to_thread(self._write_chunks, chunks)
+
+    def _write_chunks(self, chunks: list[Document]):
+        chunk_ids, page_contents, metadatas = [], [], []
+        for chunk in chunks:
+            chunk_id = f"{self.document_hash_id}:{self.chunk_count}"
+            self.chunk_count += 1
+            chunk_ids.append(chunk_id)
+            page_contents.append(chunk.page_content)
+            metadatas.append(
+                {
+                    **chunk.metadata,
+                    "document_hash_id": self.document_hash_id,
+                    "chunk_id": chunk_id,
+                    "source_file": "NA",  # To be updated when we start saving user files on server
+                    "chunk_content": chunk.page_content,
+                }
+            )
+        vector_store.add(chunk_ids, page_contents, metadatas)
+        lexical_index.add(self.document_hash_id, chunk_ids, page_contents)
+
+    async def _run_stages(self, *stages):
+        try:
+            async with asyncio.TaskGroup() as group:
+                for stage in stages:
+                    group.create_task(stage)
+        except BaseExceptionGroup as eg:
+            # Surface the first stage failure (e.g. DocumentConversionError) to callers
+            raise eg.exceptions[0] from eg
+
+    async def _replay_markdown(self, markdown_batches):
+        # Same page-batch units as a fresh conversion, so memory stays bounded
+        while (markdown := await asyncio.to_thread(next, markdown_batches, None)) is not None:
+            await self.markdown_queue.put(markdown)
+        await self.markdown_queue.put(_END_OF_STREAM)
+
+    async def run(self) -> int:
+
+        cached_batches = await asyncio.to_thread(
+            conversion_cache.iter_chunk_batches,
+            self.document_hash_id,
+            CHUNKER_ID,
+            config.INGESTION_EMBED_BATCH_SIZE,
+        )
+        if cached_batches is not None:
+            await self._run_stages(
+                self._cached_chunks_stage(cached_batches), self._write_stage()
+            )
+            return self.chunk_count
+
+        # Re-chunk cached markdown when only the chunking strategy changed
+        cached_markdown = await asyncio.to_thread(
+            conversion_cache.iter_markdown_batches, self.document_hash_id
+        )
+        source_stage = (
+            self._convert_stage()
+            if cached_markdown is None
+            else self._replay_markdown(cached_markdown)
+        )
+        self.cache_writer = await asyncio.to_thread(
+            conversion_cache.writer, self.document_hash_id, CHUNKER_ID
+        )
+        try:
+            await self._run_stages(source_stage, self._chunk_stage(), self._write_stage())
+        except Exception:
+            await asyncio.to_thread(self.cache_writer.abort)
+            raise
+
+        try:
+            await asyncio.to_thread(self.cache_writer.commit, cached_markdown is None)
+        except OSError:
+            # The entry was evicted mid-write; the document is still ingested
+            await asyncio.to_thread(self.cache_writer.abort)
+        return self.chunk_count
+
+
+async def ingest_document(
+    source: bytes | Path, document_hash_id: str, priority: Priority = Priority.BULK
+) -> int:
+    """
+    Streams a document, given as bytes or a spooled file path, into the
+    vector store and lexical index; returns its chunk count.
+    """
+    return await _IngestionRun(source, document_hash_id, priority).run()
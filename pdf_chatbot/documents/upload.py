@@ -0,0 +1,197 @@
+from fastapi import Request
+from python_multipart.multipart import MultipartParser, parse_options_header
+from python_multipart.exceptions import MultipartParseError
+from pathlib import Path
+from pdf_chatbot.errors.document_error import InvalidDocumentError
+from pdf_chatbot import config
+import tempfile
+import hashlib
+import time
+import os
+
+# Non-file form fields (message, agent_config, ...) are small and kept in memory
+_MAX_FIELD_SIZE_BYTES = 64 * 1024
+
+
+class SpooledUpload:
+    """A PDF received as a multipart part, spooled to disk and hashed while it streamed in."""
+
+    def __init__(self, path: Path, file_name: str | None, document_hash_id: str, size: int):
+        self.path = path
+        self.file_name = file_name
+        self.document_hash_id = document_hash_id
+        self.size = size
+
+    def cleanup(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+class MultipartUpload:
+    """
+    Callbacks for python-multipart's push parser. File parts are written
+    straight to the spool directory with a running SHA-256 and a size check
+    on every chunk, so an oversized upload is rejected as soon as it crosses
+    the limit instead of after the whole body has been buffered.
+    Use as a context manager to remove the spooled files afterwards.
+    """
+
+    def __init__(
+        self,
+        spool_dir: Path = config.UPLOAD_SPOOL_DIR,
+        max_files: int = config.MAX_FILES_PER_REQUEST,
+        max_file_size_bytes: int = config.MAX_FILE_SIZE_MB * 1024 * 1024,
+    ):
+        self.spool_dir = Path(spool_dir)
+        self.max_files = max_files
+        self.max_file_size_bytes = max_file_size_bytes
+        self.fields: dict[str, list[str]] = {}
+        self.files: list[SpooledUpload] = []
+        self._reset_part()
+
+    def _reset_part(self):
+        self._header_field = b""
+        self._header_value = b""
+        self._headers: dict[bytes, bytes] = {}
+        self._name = ""
+        self._file_name: str | None = None
+        self._value = bytearray()
+        self._file = None
+        self._path: Path | None = None
+        self._hasher = None
+        self._size = 0
+
+    @property
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self._reset_part,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        }
+
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        self._name = options.get(b"name", b"").decode("utf-8")
+        file_name = options.get(b"filename")
+        if file_name is None:
+            return
+        if len(self.files) >= self.max_files:
+            raise InvalidDocumentError(
+                f"Too many files uploaded. Maximum of {self.max_files} files allowed."
+            )
+        self._file_name = file_name.decode("utf-8")
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        fd, path = tempfile.mkstemp(suffix=".pdf", dir=self.spool_dir)
+        self._file = os.fdopen(fd, "wb")
+        self._path = Path(path)
+        self._hasher = hashlib.sha256()
+
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        chunk = data[start:end]
+        if self._file is None:
+            self._value += chunk
+            if len(self._value) > _MAX_FIELD_SIZE_BYTES:
+                raise InvalidDocumentError(f"Form field '{self._name}' is too large")
+            return
+        self._size += len(chunk)
+        if self._size > self.max_file_size_bytes:
+            raise InvalidDocumentError(
+                f"File exceeds maximum allowed size ({config.MAX_FILE_SIZE_MB} MB)"
+            )
+        self._hasher.update(chunk)
+        self._file.write(chunk)
+
+    def _on_part_end(self):
+        if self._file is None:
+            self.fields.setdefault(self._name, []).append(self._value.decode("utf-8"))
+            return
+        self._file.close()
+        self._file = None
+        if self._size == 0:
+            # Browsers send an empty part for a file input left blank
+            self._path.unlink(missing_ok=True)
+            return
+        self.files.append(
+            SpooledUpload(
+                path=self._path,
+                file_name=self._file_name,
+                document_hash_id=self._hasher.hexdigest(),
+                size=self._size,
+            )
+        )
+
+    def field(self, name: str) -> str | None:
+        values = self.fields.get(name)
+        return values[-1] if values else None
+
+    def cleanup(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._path.unlink(missing_ok=True)
+        for file in self.files:
+            file.cleanup()
+
+    def __enter__(self) -> "MultipartUpload":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.cleanup()
+
+
+async def spool_multipart_upload(request: Request, **limits) -> MultipartUpload:
+    """Parses a multipart/form-data request body as it streams in."""
+
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise InvalidDocumentError("Expected a multipart/form-data request body")
+
+    upload = MultipartUpload(**limits)
+    # Reject bodies that cannot fit the limits before reading any of them
+    content_length = request.headers.get("content-length", "")
+    max_body_size = upload.max_files * (upload.max_file_size_bytes + _MAX_FIELD_SIZE_BYTES)
+    if content_length.isdigit() and int(content_length) > max_body_size:
+        raise InvalidDocumentError(
+            f"Upload exceeds maximum allowed size ({config.MAX_FILE_SIZE_MB} MB per file)"
+        )
+
+    parser = MultipartParser(params[b"boundary"], upload.callbacks)
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+        parser.finalize()
+    except MultipartParseError as e:
+        upload.cleanup()
+        raise InvalidDocumentError("Malformed multipart request body") from e
+    except Exception:
+        upload.cleanup()
+        raise
+    return upload
+
+
+def remove_stale_uploads(
+    spool_dir: Path = config.UPLOAD_SPOOL_DIR,
+    max_age_seconds: float = config.UPLOAD_SPOOL_STALE_SECONDS,
+) -> None:
+    # Spooled files left behind by a process that exited mid-request. Only old
+    # files go, as other workers spool their in-flight uploads here too.
+    cutoff = time.time() - max_age_seconds
+    for path in Path(spool_dir).glob("*.pdf"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink(missing_ok=True)
+        except FileNotFoundError:
+            continue
@@ -0,0 +1,11 @@
+from pdf_chatbot.errors.base import PDFChatbotError
+
+
+class AuthError(PDFChatbotError):
+    """Base class for account and authentication errors."""
+    pass
+
+
+class PasswordHasherOverloadedError(AuthError):
+    """Too many password hash/verify requests are already queued."""
+    pass
@@ -0,0 +1,11 @@
+from pdf_chatbot.errors.base import PDFChatbotError
+
+
+class ChatError(PDFChatbotError):
+    """Base class for chat-related errors."""
+    pass
+
+
+class InvalidCursorError(ChatError):
+    """History cursor does not reference a message in the conversation."""
+    pass
@@ -19,3 +19,8 @@ class DocumentConversionError(DocumentError):
 class DocumentChunkingError(DocumentError):
     """Document could not be chunked."""
     pass
+
+
+class DocumentNotFoundError(DocumentError):
+    """Referenced document or ingestion job does not exist for the user."""
+    pass
@@ -12,3 +12,10 @@ class LLMServiceError(RAGAgentError):
 
     def __init__(self, message="LLM service timed out or is unavailable", *args):
         super().__init__(message, *args)
+
+
+class RerankerError(RAGAgentError):
+    """Cross-encoder reranking failed or did not answer in time."""
+
+    def __init__(self, message="Reranking timed out or is unavailable", *args):
+        super().__init__(message, *args)
@@ -0,0 +1,16 @@
+from pdf_chatbot.errors.base import PDFChatbotError
+
+
+class SchedulerError(PDFChatbotError):
+    """Base class for admission-control errors."""
+    pass
+
+
+class CapacityExceededError(SchedulerError):
+    """The queue for a kind of work is full; the request was not admitted."""
+    pass
+
+
+class CapacityTimeoutError(SchedulerError):
+    """The request waited longer than allowed for a free slot."""
+    pass
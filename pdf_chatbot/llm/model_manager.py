@@ -1,6 +1,10 @@
 from langchain_ollama import ChatOllama
 from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_core.language_models.chat_models import BaseChatModel
+import threading
 import asyncio
+import httpx
+import time
 import os
 import dotenv
 from pdf_chatbot import config
@@ -8,35 +12,153 @@ from pdf_chatbot import config
 dotenv.load_dotenv()
 
 
-def _get_ollama_instance(model: str | None = None):
+def _get_ollama_instance(model: str | None = None, **options):
     if not model:
         model = config.DEFAULT_LLM_MODELS["ollama"]
-    return ChatOllama(base_url=os.getenv("OLLAMA_BASE_URL"), model=model)
+    # Bounded keep-alive pool shared by every request through this client
+    limits = httpx.Limits(
+        max_connections=config.LLM_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=config.LLM_HTTP_MAX_CONNECTIONS,
+        keepalive_expiry=config.LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+    )
+    return ChatOllama(
+        base_url=os.getenv("OLLAMA_BASE_URL"),
+        model=model,
+        client_kwargs={"limits": limits},
+        **options,
+    )
 
 
-def _get_gemini_instance(model: str | None = None):
+def _get_gemini_instance(model: str | None = None, **options):
     if not model:
         model = config.DEFAULT_LLM_MODELS["gemini"]
     return ChatGoogleGenerativeAI(
-        model=model, google_api_key=os.getenv("GOOGLE_API_KEY")
+        model=model, google_api_key=os.getenv("GOOGLE_API_KEY"), **options
     )
 
 
+_LLM_FACTORIES = {"gemini": _get_gemini_instance, "ollama": _get_ollama_instance}
+
+
+class _LLMClient:
+
+    def __init__(self, platform: str, model: str | None, llm: BaseChatModel):
+        self.platform = platform
+        self.model = model
+        self.llm = llm
+        self.created_at = time.time()
+        self.uses = 0
+
+
+class _LLMClientRegistry:
+    """
+    Long-lived chat model clients keyed by (platform, model, options).
+    Building a client creates its HTTP client, so reusing one keeps its
+    keep-alive connections warm instead of paying new TCP/TLS handshakes
+    on every graph node. Clients are closed by close_all() on shutdown.
+    """
+
+    def __init__(self):
+        self._clients: dict[tuple, _LLMClient] = {}
+        # Guards the dicts and counters only; clients are built under a
+        # per-key lock so a slow build never blocks other lookups
+        self._lock = threading.Lock()
+        self._build_locks: dict[tuple, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, platform: str, model: str | None, options: dict) -> tuple:
+        platform = platform.strip().lower()
+        if platform not in _LLM_FACTORIES:
+            raise ValueError(
+                f"Unsupported LLM platform passed. Supported LLM platforms : {config.LLM_PLATFORMS}"
+            )
+        model = model or config.DEFAULT_LLM_MODELS[platform]
+        return (platform, model, tuple(sorted(options.items())))
+
+    def _lookup(self, key: tuple) -> BaseChatModel | None:
+        client = self._clients.get(key)
+        if client is None:
+            return None
+        self.hits += 1
+        client.uses += 1
+        return client.llm
+
+    def get(self, platform: str, model: str | None = None, **options) -> BaseChatModel:
+        key = self._key(platform, model, options)
+        with self._lock:
+            if (llm := self._lookup(key)) is not None:
+                return llm
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+        with build_lock:
+            # Another thread may have built it while we waited
+            with self._lock:
+                if (llm := self._lookup(key)) is not None:
+                    return llm
+            platform, model, _ = key
+            client = _LLMClient(
+                platform, model, _LLM_FACTORIES[platform](model, **options)
+            )
+            client.uses = 1
+            with self._lock:
+                self._clients[key] = client
+                self.misses += 1
+            return client.llm
+
+    async def aget(
+        self, platform: str, model: str | None = None, **options
+    ) -> BaseChatModel:
+        key = self._key(platform, model, options)
+        # Lock-free fast path: a dict read is atomic, and the event loop must
+        # never wait on a lock a building thread may hold
+        client = self._clients.get(key)
+        if client is not None:
+            self.hits += 1
+            client.uses += 1
+            return client.llm
+        # Client construction may block (credential discovery), keep it off the loop
+        return await asyncio.to_thread(self.get, platform, model, **options)
+
+    async def close_all(self) -> None:
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+            self._build_locks.clear()
+        for client in clients:
+            try:
+                await _close_client(client.llm)
+            except Exception as e:
+                print(f"Failed to close {client.platform} client: {e!r}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "clients": len(self._clients),
+                "hits": self.hits,
+                "misses": self.misses,
+                "uses": {
+                    f"{client.platform}:{client.model}": client.uses
+                    for client in self._clients.values()
+                },
+            }
+
+
+async def _close_client(llm: BaseChatModel) -> None:
+    if isinstance(llm, ChatOllama):
+        # ollama.Client / AsyncClient wrap httpx clients
+        llm._client._client.close()
+        await llm._async_client._client.aclose()
+    elif isinstance(llm, ChatGoogleGenerativeAI) and llm.client is not None:
+        await llm.client.aio.aclose()
+        llm.client.close()
+
+
+llm_client_registry = _LLMClientRegistry()
+
+
 def get_llm_instance(platform: str, model: str = None):
-    if platform.strip().lower() == "gemini":
-        return _get_gemini_instance(model)
-    if platform.strip().lower() == "ollama":
-        return _get_ollama_instance(model)
-    raise ValueError(
-        f"Unsupported LLM platform passed. Supported LLM platforms : {config.LLM_PLATFORMS}"
-    )
+    return llm_client_registry.get(platform, model)
 
 
 async def get_llm_instance_async(platform: str, model: str = None):
-    if platform.strip().lower() == "gemini":
-        return await asyncio.to_thread(_get_gemini_instance, model)
-    if platform.strip().lower() == "ollama":
-        return await asyncio.to_thread(_get_ollama_instance, model)
-    raise ValueError(
-        f"Unsupported LLM platform passed. Supported LLM platforms : {config.LLM_PLATFORMS}"
-    )
+    return await llm_client_registry.aget(platform, model)
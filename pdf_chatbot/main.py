@@ -1 +1,61 @@
-from pdf_chatbot.api.routes import app
\ No newline at end of file
+from fastapi import FastAPI
+from contextlib import asynccontextmanager
+import asyncio
+
+from pdf_chatbot import config
+from pdf_chatbot.api.routes import router
+from pdf_chatbot.api.error_handlers import (
+    auth_error_handler,
+    chat_error_handler,
+    document_error_handler,
+    document_not_found_error_handler,
+    rag_agent_error_handler,
+    scheduler_error_handler,
+)
+from pdf_chatbot.db import setup, migrations
+from pdf_chatbot.documents.conversion_pool import conversion_pool
+from pdf_chatbot.documents.upload import remove_stale_uploads
+from pdf_chatbot.errors.auth_error import AuthError
+from pdf_chatbot.errors.chat_error import ChatError
+from pdf_chatbot.errors.document_error import DocumentError, DocumentNotFoundError
+from pdf_chatbot.errors.rag_agent_error import RAGAgentError
+from pdf_chatbot.errors.scheduler_error import SchedulerError
+from pdf_chatbot.llm.model_manager import llm_client_registry
+from pdf_chatbot.model_registry import model_registry
+from pdf_chatbot.user.password_hasher import password_hasher
+from pdf_chatbot.user.session import session_manager
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    setup.initialize_db()
+    remove_stale_uploads()
+    await asyncio.to_thread(migrations.migrate_chat_history_files)
+    await asyncio.to_thread(migrations.migrate_to_shared_document_chunks)
+    # Warmed in the background so /healthz answers at once and /readyz
+    # flips once every model is loaded; early requests load on demand
+    warmup = asyncio.create_task(
+        asyncio.to_thread(model_registry.warmup, config.MODEL_WARMUP_PARALLEL)
+    )
+    session_sweeper = asyncio.create_task(session_manager.run_sweeper())
+    yield
+    session_sweeper.cancel()
+    warmup.cancel()
+    conversion_pool.shutdown()
+    password_hasher.shutdown()
+    await llm_client_registry.close_all()
+
+
+def create_app() -> FastAPI:
+    app = FastAPI(lifespan=lifespan)
+    app.add_exception_handler(DocumentError, document_error_handler)
+    app.add_exception_handler(DocumentNotFoundError, document_not_found_error_handler)
+    app.add_exception_handler(RAGAgentError, rag_agent_error_handler)
+    app.add_exception_handler(ChatError, chat_error_handler)
+    app.add_exception_handler(AuthError, auth_error_handler)
+    app.add_exception_handler(SchedulerError, scheduler_error_handler)
+    app.include_router(router)
+    return app
+
+
+app = create_app()
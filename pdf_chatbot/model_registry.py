@@ -0,0 +1,98 @@
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from typing import Any, Callable
+import threading
+import time
+
+
+class ComponentState(str, Enum):
+    PENDING = "PENDING"
+    LOADING = "LOADING"
+    READY = "READY"
+    FAILED = "FAILED"
+
+
+class _Component:
+
+    def __init__(self, name: str, loader: Callable[[], Any], warmup: bool):
+        self.name = name
+        self.loader = loader
+        self.warmup = warmup
+        self.instance: Any = None
+        self.state = ComponentState.PENDING
+        self.load_seconds: float | None = None
+        self.error: str | None = None
+        self.lock = threading.Lock()
+
+
+class _ModelRegistry:
+    """
+    Heavy components (models, worker pools) registered by name with a
+    loader and constructed on first use instead of at import time.
+    warmup() loads every component flagged for warmup, optionally in
+    parallel, and the registry records each component's load time and
+    state for the readiness probe.
+    """
+
+    def __init__(self):
+        self._components: dict[str, _Component] = {}
+        self.warmup_seconds: float | None = None
+
+    def register(self, name: str, loader: Callable[[], Any], warmup: bool = True):
+        if name not in self._components:
+            self._components[name] = _Component(name, loader, warmup)
+
+    def get(self, name: str) -> Any:
+        component = self._components[name]
+        if component.state == ComponentState.READY:
+            return component.instance
+        # Concurrent callers wait for a single load instead of loading twice
+        with component.lock:
+            if component.state != ComponentState.READY:
+                self._load(component)
+        return component.instance
+
+    def _load(self, component: _Component):
+        component.state = ComponentState.LOADING
+        start = time.perf_counter()
+        try:
+            component.instance = component.loader()
+        except Exception as e:
+            component.state = ComponentState.FAILED
+            component.error = repr(e)
+            raise
+        finally:
+            component.load_seconds = time.perf_counter() - start
+        component.error = None
+        component.state = ComponentState.READY
+        print(f"Loaded {component.name} in {component.load_seconds:.2f}s")
+
+    def warmup(self, parallel: bool = True) -> None:
+        names = [name for name, component in self._components.items() if component.warmup]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(len(names), 1) if parallel else 1) as executor:
+            # Failures are recorded on the component; readiness stays false
+            futures = [executor.submit(self.get, name) for name in names]
+            for future in futures:
+                future.exception()
+        self.warmup_seconds = time.perf_counter() - start
+
+    def is_ready(self) -> bool:
+        return all(
+            component.state == ComponentState.READY
+            for component in self._components.values()
+            if component.warmup
+        )
+
+    def stats(self) -> dict:
+        return {
+            name: {
+                "state": component.state,
+                "load_seconds": component.load_seconds,
+                "error": component.error,
+            }
+            for name, component in self._components.items()
+        }
+
+
+model_registry = _ModelRegistry()
@@ -0,0 +1,127 @@
+from collections import OrderedDict
+import itertools
+import threading
+import time
+import numpy as np
+import pdf_chatbot.config as config
+
+
+class _CachedAnswer:
+
+    def __init__(
+        self,
+        scope: tuple,
+        query: str,
+        embedding: np.ndarray,
+        answer: str,
+        evidences: list[str],
+    ):
+        self.scope = scope
+        self.query = query
+        self.embedding = embedding
+        self.answer = answer
+        self.evidences = evidences
+        self.created_at = time.monotonic()
+
+
+class SemanticAnswerCache:
+    """
+    Bounded, thread-safe LRU of grounded answers. Entries are scoped by the
+    exact set of documents and the model that produced them, and a lookup
+    returns the closest cached question in that scope when its cosine
+    similarity to the new question reaches similarity_threshold. Document
+    hashes identify content, so an answer stays valid for its scope until
+    it ages out after the TTL.
+    """
+
+    def __init__(
+        self,
+        max_size: int = config.ANSWER_CACHE_MAX_SIZE,
+        ttl_seconds: float = config.ANSWER_CACHE_TTL_SECONDS,
+        similarity_threshold: float = config.ANSWER_CACHE_SIMILARITY_THRESHOLD,
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self._entries: OrderedDict[int, _CachedAnswer] = OrderedDict()
+        self._scopes: dict[tuple, set[int]] = {}
+        self._entry_ids = itertools.count()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _scope(self, document_hash_ids: list[str], model: str) -> tuple:
+        return (frozenset(document_hash_ids), model)
+
+    def _normalize(self, embedding: list[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _remove(self, entry_id: int):
+        entry = self._entries.pop(entry_id)
+        scope_ids = self._scopes[entry.scope]
+        scope_ids.discard(entry_id)
+        if not scope_ids:
+            del self._scopes[entry.scope]
+
+    def get(
+        self, document_hash_ids: list[str], model: str, query_embedding: list[float]
+    ) -> _CachedAnswer | None:
+
+        scope = self._scope(document_hash_ids, model)
+        query_vector = self._normalize(query_embedding)
+        now = time.monotonic()
+        with self._lock:
+            best_id, best_similarity = None, self.similarity_threshold
+            for entry_id in list(self._scopes.get(scope, ())):
+                entry = self._entries[entry_id]
+                if now - entry.created_at >= self.ttl_seconds:
+                    self._remove(entry_id)
+                    continue
+                similarity = float(np.dot(entry.embedding, query_vector))
+                if similarity >= best_similarity:
+                    best_id, best_similarity = entry_id, similarity
+            if best_id is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best_id)
+            self.hits += 1
+            return self._entries[best_id]
+
+    def put(
+        self,
+        document_hash_ids: list[str],
+        model: str,
+        query: str,
+        query_embedding: list[float],
+        answer: str,
+        evidences: list[str],
+    ):
+        scope = self._scope(document_hash_ids, model)
+        entry = _CachedAnswer(
+            scope, query, self._normalize(query_embedding), answer, list(evidences)
+        )
+        with self._lock:
+            entry_id = next(self._entry_ids)
+            self._entries[entry_id] = entry
+            self._scopes.setdefault(scope, set()).add(entry_id)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "scopes": len(self._scopes),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0,
+                "evictions": self.evictions,
+            }
+
+
+answer_cache = SemanticAnswerCache()
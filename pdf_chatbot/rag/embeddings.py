@@ -0,0 +1,67 @@
+from collections import OrderedDict
+from chromadb.utils.embedding_functions import SentenceTransformerEmbeddingFunction
+from langchain_core.embeddings import Embeddings
+from pdf_chatbot.model_registry import model_registry
+import threading
+import pdf_chatbot.config as config
+
+
+class EmbeddingEngine(Embeddings):
+    """
+    Single sentence-transformer model shared by ingestion and retrieval.
+    Exposes the Chroma embedding function used by the collection, and
+    implements LangChain's Embeddings interface on top of the same model
+    with an LRU cache of query embeddings. The model itself is loaded
+    through the model registry on first use.
+    """
+
+    def __init__(
+        self,
+        model_name: str = config.VECTOR_EMBEDDING_MODEL,
+        query_cache_size: int = config.QUERY_EMBEDDING_CACHE_SIZE,
+    ):
+        self.model_name = model_name
+        model_registry.register(
+            f"embedding:{model_name}",
+            lambda: SentenceTransformerEmbeddingFunction(model_name=model_name),
+        )
+        self.query_cache_size = query_cache_size
+        self._query_cache: OrderedDict[str, list[float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def embedding_function(self) -> SentenceTransformerEmbeddingFunction:
+        return model_registry.get(f"embedding:{self.model_name}")
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [embedding.tolist() for embedding in self.embedding_function(texts)]
+
+    def embed_query(self, text: str) -> list[float]:
+        key = " ".join(text.split())
+        with self._lock:
+            embedding = self._query_cache.get(key)
+            if embedding is not None:
+                self._query_cache.move_to_end(key)
+                self.hits += 1
+                return embedding
+            self.misses += 1
+
+        embedding = self.embed_documents([key])[0]
+        with self._lock:
+            self._query_cache[key] = embedding
+            while len(self._query_cache) > self.query_cache_size:
+                self._query_cache.popitem(last=False)
+        return embedding
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "query_cache_size": len(self._query_cache),
+                "query_cache_hits": self.hits,
+                "query_cache_misses": self.misses,
+            }
+
+
+embedding_engine = EmbeddingEngine()
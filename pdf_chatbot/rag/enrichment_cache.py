@@ -0,0 +1,89 @@
+from collections import OrderedDict
+from langchain_core.messages import BaseMessage
+import hashlib
+import threading
+import re
+import pdf_chatbot.config as config
+
+# Words that usually point back into the conversation ("what about it?")
+_REFERENCE_WORDS = frozenset(
+    """
+    it its it's this that these those they them their theirs he him his she
+    her hers above previous previously earlier former latter same again
+    also more else one ones there then
+    """.split()
+)
+_WORD_PATTERN = re.compile(r"[a-z']+")
+
+
+def is_self_contained(text: str) -> bool:
+    """
+    Cheap heuristic for questions that enrichment cannot improve: long
+    enough to carry their own subject and free of words that refer back
+    to earlier messages.
+    """
+    words = _WORD_PATTERN.findall(text.lower())
+    if len(words) < config.QUERY_ENRICHMENT_SELF_CONTAINED_MIN_WORDS:
+        return False
+    return _REFERENCE_WORDS.isdisjoint(words)
+
+
+class QueryEnrichmentCache:
+    """
+    Bounded, thread-safe LRU of enriched queries keyed by a hash of the
+    model, the recent history window and the input, plus counters of the
+    enrichment calls that were skipped or served from the cache.
+    """
+
+    def __init__(self, max_size: int = config.QUERY_ENRICHMENT_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.skipped_no_history = 0
+        self.skipped_self_contained = 0
+
+    def key(self, model: str, history: list[BaseMessage], input: str) -> str:
+        digest = hashlib.sha256(model.encode("utf-8"))
+        for message in history:
+            digest.update(f"\0{message.type}\0{message.content}".encode("utf-8"))
+        digest.update(f"\0input\0{input}".encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            enriched_query = self._entries.get(key)
+            if enriched_query is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return enriched_query
+
+    def put(self, key: str, enriched_query: str):
+        with self._lock:
+            self._entries[key] = enriched_query
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def record_skip(self, self_contained: bool):
+        with self._lock:
+            if self_contained:
+                self.skipped_self_contained += 1
+            else:
+                self.skipped_no_history += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "skipped_no_history": self.skipped_no_history,
+                "skipped_self_contained": self.skipped_self_contained,
+            }
+
+
+enrichment_cache = QueryEnrichmentCache()
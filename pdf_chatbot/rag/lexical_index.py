@@ -0,0 +1,155 @@
+import re
+import sqlite3
+import threading
+from typing import Sequence
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+import pdf_chatbot.config as config
+
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Bump when the table layout changes; older indexes are dropped and backfilled
+_SCHEMA_VERSION = 1
+
+
+class LexicalIndex:
+    """
+    Persistent BM25 index (SQLite FTS5) over document chunks.
+    Updated at ingestion time and queried scoped by document hashes,
+    so lookups only touch the postings of the query terms.
+    """
+
+    _lexical_index_instances = {}
+
+    @classmethod
+    def get_instance(cls, db_path: str = config.LEXICAL_INDEX_DB_PATH):
+
+        db_path = str(db_path)
+        if db_path not in cls._lexical_index_instances:
+            cls._lexical_index_instances[db_path] = cls(db_path)
+        return cls._lexical_index_instances[db_path]
+
+    def __init__(self, db_path: str = config.LEXICAL_INDEX_DB_PATH):
+
+        self.db_path = str(db_path)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        with self._lock:
+            self._create_schema()
+
+    def _create_schema(self):
+
+        (schema_version,) = self.conn.execute("PRAGMA user_version").fetchone()
+        if schema_version < _SCHEMA_VERSION:
+            self.conn.execute("DROP TABLE IF EXISTS chunks")
+            self.conn.execute("DROP TABLE IF EXISTS chunk_meta")
+
+        self.conn.execute(
+            """CREATE VIRTUAL TABLE IF NOT EXISTS chunks USING fts5(
+            content,
+            document_hash_id UNINDEXED
+            )
+            """
+        )
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS chunk_meta(
+            rowid INTEGER PRIMARY KEY,
+            chunk_id TEXT UNIQUE NOT NULL,
+            document_hash_id TEXT NOT NULL
+            )
+            """
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_chunk_meta_document ON chunk_meta (document_hash_id)"
+        )
+        self.conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        self.conn.commit()
+
+    def add(
+        self,
+        document_hash_id: str,
+        chunk_ids: Sequence[str],
+        chunks: Sequence[str],
+    ) -> None:
+        with self._lock:
+            for chunk_id, content in zip(chunk_ids, chunks):
+                row = self.conn.execute(
+                    "SELECT rowid FROM chunk_meta WHERE chunk_id = ?", (chunk_id,)
+                ).fetchone()
+                if row:
+                    self.conn.execute(
+                        "UPDATE chunks SET content = ? WHERE rowid = ?",
+                        (content, row[0]),
+                    )
+                    continue
+                cur = self.conn.execute(
+                    "INSERT INTO chunk_meta (chunk_id, document_hash_id) VALUES (?, ?)",
+                    (chunk_id, document_hash_id),
+                )
+                self.conn.execute(
+                    "INSERT INTO chunks (rowid, content, document_hash_id) VALUES (?, ?, ?)",
+                    (cur.lastrowid, content, document_hash_id),
+                )
+            self.conn.commit()
+
+    def document_exists(self, document_hash_id: str) -> bool:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT 1 FROM chunk_meta WHERE document_hash_id = ? LIMIT 1",
+                (document_hash_id,),
+            ).fetchone()
+        return row is not None
+
+    def search(
+        self,
+        query: str,
+        document_hash_ids: Sequence[str],
+        k: int = config.VECTOR_RETRIEVER_MAX_DOCS,
+    ) -> list[Document]:
+
+        match_expression = self._to_match_expression(query)
+        if not match_expression or not document_hash_ids:
+            return []
+
+        placeholders = ", ".join("?" for _ in document_hash_ids)
+        with self._lock:
+            rows = self.conn.execute(
+                f"""SELECT chunks.content, chunk_meta.chunk_id, chunk_meta.document_hash_id
+                FROM chunks JOIN chunk_meta ON chunk_meta.rowid = chunks.rowid
+                WHERE chunks MATCH ?
+                    AND chunks.document_hash_id IN ({placeholders})
+                ORDER BY bm25(chunks)
+                LIMIT ?""",
+                (match_expression, *document_hash_ids, k),
+            ).fetchall()
+        return [
+            Document(
+                page_content=content,
+                metadata={"chunk_id": chunk_id, "document_hash_id": document_hash_id},
+            )
+            for content, chunk_id, document_hash_id in rows
+        ]
+
+    def _to_match_expression(self, query: str) -> str:
+        # Quote every term so user input can never be parsed as FTS5 syntax
+        terms = dict.fromkeys(token.lower() for token in _TOKEN_PATTERN.findall(query))
+        return " OR ".join(f'"{term}"' for term in terms)
+
+
+class LexicalRetriever(BaseRetriever):
+    """LangChain adapter over LexicalIndex for a fixed document scope."""
+
+    index: LexicalIndex
+    document_hash_ids: list[str]
+    k: int = config.VECTOR_RETRIEVER_MAX_DOCS
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        return self.index.search(
+            query=query, document_hash_ids=self.document_hash_ids, k=self.k
+        )
@@ -1,14 +1,28 @@
 from langgraph.graph import StateGraph, END
+from langgraph.graph.state import CompiledStateGraph
 from langchain.messages import AIMessage, HumanMessage
 from langchain_core.output_parsers import StrOutputParser
-from pydantic import BaseModel, Field
+from langchain_core.documents import Document
+from langchain_core.runnables import Runnable
+from langgraph.config import get_stream_writer
+from pydantic import BaseModel, Field, ValidationError
+from typing import AsyncIterator
+import threading
 import asyncio
+import re
 
-from pdf_chatbot.schemas.agent import RAGAgentState
+from pdf_chatbot.schemas.agent import AgentConfig, RAGAgentState
 import pdf_chatbot.llm.prompt_templates as PromptTemplates
 from pdf_chatbot.llm.model_manager import get_llm_instance_async
-from pdf_chatbot.rag.retriever import ScopedHybridRetriever
+from pdf_chatbot.rag.retriever import ScopedHybridRetriever, rerank
+from pdf_chatbot.rag.retriever_cache import retriever_cache
+from pdf_chatbot.rag.answer_cache import answer_cache
+from pdf_chatbot.rag.enrichment_cache import enrichment_cache, is_self_contained
+from pdf_chatbot.rag.embeddings import embedding_engine
+from pdf_chatbot.db import async_repository
+from pdf_chatbot.schemas.document import DocumentStatus
 from pdf_chatbot.errors.rag_agent_error import LLMServiceError
+from pdf_chatbot.scheduler import scheduler
 import pdf_chatbot.config as config
 
 
@@ -25,57 +39,142 @@ To proceed, you can:
 """
 
 
+class QueryResponse(BaseModel):
+    is_evidence_based: bool = Field(
+        description="Is your response rooted based on provided context"
+    )
+    evidences: list[str] = Field(
+        description="References to the context on which you have rooted your response."
+    )
+    response: str = Field(
+        description="Response to the user query based on provided context."
+    )
+
+
+def _is_near_identical(query: str, other: str) -> bool:
+    words = set(re.findall(r"\w+", query.lower()))
+    other_words = set(re.findall(r"\w+", other.lower()))
+    if not words or not other_words:
+        return words == other_words
+    overlap = len(words & other_words) / len(words | other_words)
+    return overlap >= config.SPECULATIVE_RETRIEVAL_SKIP_SIMILARITY
+
+
+def _merge_candidates(*candidate_lists: list[Document]) -> list[Document]:
+    # Same de-duplication key as the EnsembleRetriever producing each list
+    merged = {}
+    for candidates in candidate_lists:
+        for doc in candidates:
+            merged.setdefault(doc.page_content, doc)
+    return list(merged.values())
+
+
 class RAGAgent:
+    """
+    Retrieval-augmented answering as a LangGraph graph. The graph is
+    compiled once per feature variant (see _variant) and reused by every
+    request; nodes only read and return the state they are given, so one
+    compiled graph is safe to run concurrently.
+    """
 
     def __init__(self):
-        self.graph = StateGraph(RAGAgentState)
-        self._compile_graph()
+        self._apps: dict[tuple, CompiledStateGraph] = {}
+        self._apps_lock = threading.Lock()
 
     async def _enrich_query_for_retreival(self, state: RAGAgentState) -> RAGAgentState:
 
-        if not state.config.query_enrichment_enabled:
+        # The last message is the current input; enrichment only resolves
+        # references to earlier ones, so without them it cannot help
+        history = state.messages[:-1]
+        if not history or is_self_contained(state.input):
+            enrichment_cache.record_skip(self_contained=bool(history))
             return state
 
+        model = config.QUERY_ENRICHMENT_MODEL[state.config.llm_platform]
+        history_window = state.messages[-config.QUERY_ENRICHMENT_HISTORY_MESSAGES :]
+        cache_key = enrichment_cache.key(
+            f"{state.config.llm_platform}:{model}", history_window, state.input
+        )
+        enriched_query = enrichment_cache.get(cache_key)
+        if enriched_query is not None:
+            return state.model_copy(update={"enriched_query": enriched_query})
+
         llm = None
         try:
             llm = await asyncio.wait_for(
-                get_llm_instance_async(
-                    platform=state.config.llm_platform,
-                    model=config.QUERY_ENRICHMENT_MODEL[state.config.llm_platform],
-                ),
+                get_llm_instance_async(platform=state.config.llm_platform, model=model),
                 timeout=config.LLM_DEFAULT_TIMEOUT,
             )
         except asyncio.TimeoutError as e:
             raise LLMServiceError() from e
 
-        enriched_query = None
         chain = PromptTemplates.QUERY_ENRICHMENT_PROMPT | llm | StrOutputParser()
         try:
-            enriched_query = await asyncio.wait_for(
-                chain.ainvoke({"messages": state.messages, "input": state.input}),
-                timeout=config.LLM_DEFAULT_TIMEOUT,
-            )
+            async with scheduler.slot("llm"):
+                enriched_query = await asyncio.wait_for(
+                    chain.ainvoke({"messages": history_window, "input": state.input}),
+                    timeout=config.LLM_DEFAULT_TIMEOUT,
+                )
         except asyncio.TimeoutError as e:
             raise LLMServiceError() from e
         print(f"**** ENRICHED QUERY *** : {enriched_query}")
+        enrichment_cache.put(cache_key, enriched_query)
         return state.model_copy(update={"enriched_query": enriched_query})
 
+    def _get_retriever(self, state: RAGAgentState) -> ScopedHybridRetriever:
+        return retriever_cache.get(
+            user_id=state.user_id,
+            document_hash_ids=state.active_documents_hash_list,
+        )
+
     async def _get_context(self, state: RAGAgentState) -> RAGAgentState:
 
-        metadata_filter = {
-            "$and": [
-                {"user_id": state.user_id},
-                {"document_hash_id": {"$in": state.active_documents_hash_list}},
-            ]
-        }
+        query = state.enriched_query or state.input
+        retriever = await asyncio.to_thread(self._get_retriever, state)
+        candidates = await self._retrieve_candidates(retriever, query)
+        retrieved_docs = await self._rerank(query, candidates)
+        context = "\n\n".join([doc.page_content for doc in retrieved_docs])
+        return state.model_copy(update={"context": context})
 
-        def retrieve_docs():
-            retriever = ScopedHybridRetriever(metadata_filter=metadata_filter)
-            query = state.enriched_query or state.input
-            docs = retriever.query_docs(query=query, k=3)
-            return docs
+    async def _retrieve_candidates(
+        self, retriever: ScopedHybridRetriever, query: str
+    ) -> list[Document]:
+        return await asyncio.to_thread(retriever.retrieve_candidates, query)
+
+    async def _rerank(self, query: str, candidates: list[Document]) -> list[Document]:
+        # The slot covers only the cross-encoder, once per request, so
+        # concurrent requests reach the batched reranker together
+        async with scheduler.slot("reranking"):
+            return await asyncio.to_thread(rerank, query, candidates, 3)
+
+    async def _enrich_and_get_context(self, state: RAGAgentState) -> RAGAgentState:
+        """
+        Speculative variant of enrich_query -> get_context: candidates for the
+        raw input are retrieved while the enrichment LLM call is in flight.
+        The enriched query is searched afterwards unless it is near-identical
+        to the input, and the merged candidates are reranked once against it.
+        """
+
+        async def retrieve_raw_candidates():
+            # The retriever is resolved once and reused for the enriched query
+            retriever = await asyncio.to_thread(self._get_retriever, state)
+            return retriever, await self._retrieve_candidates(retriever, state.input)
+
+        raw_retrieval = asyncio.create_task(retrieve_raw_candidates())
+        try:
+            state = await self._enrich_query_for_retreival(state)
+        except BaseException:
+            raw_retrieval.cancel()
+            raise
+        retriever, candidates = await raw_retrieval
+
+        query = state.enriched_query or state.input
+        if not _is_near_identical(query, state.input):
+            candidates = _merge_candidates(
+                candidates, await self._retrieve_candidates(retriever, query)
+            )
 
-        retrieved_docs = await asyncio.to_thread(retrieve_docs)
+        retrieved_docs = await self._rerank(query, candidates)
         context = "\n\n".join([doc.page_content for doc in retrieved_docs])
         return state.model_copy(update={"context": context})
 
@@ -93,18 +192,36 @@ class RAGAgent:
             }
         )
 
-    async def _respond_to_user_query(self, state: RAGAgentState) -> RAGAgentState:
+    async def _stream_query_response(
+        self, chain: Runnable, prompt_inputs: dict
+    ) -> QueryResponse:
+        """
+        Streams the structured output as partial JSON, forwarding the growing
+        'response' field to the graph's custom stream once the model has
+        declared the answer evidence based.
+        """
+
+        write_stream = get_stream_writer()
+        streamed_response = ""
+        partial_output = {}
+        async for partial_output in chain.astream(prompt_inputs):
+            if not partial_output or not partial_output.get("is_evidence_based"):
+                continue
+            response = partial_output.get("response") or ""
+            if len(response) > len(streamed_response) and response.startswith(
+                streamed_response
+            ):
+                write_stream(
+                    {"type": "token", "content": response[len(streamed_response) :]}
+                )
+                streamed_response = response
 
-        class QueryResponse(BaseModel):
-            is_evidence_based: bool = Field(
-                description="Is your response rooted based on provided context"
-            )
-            evidences: list[str] = Field(
-                description="References to the context on which you have rooted your response."
-            )
-            response: str = Field(
-                description="Response to the user query based on provided context."
-            )
+        try:
+            return QueryResponse.model_validate(partial_output)
+        except ValidationError as e:
+            raise LLMServiceError("LLM returned an invalid structured response") from e
+
+    async def _respond_to_user_query(self, state: RAGAgentState) -> RAGAgentState:
 
         llm = None
         try:
@@ -115,9 +232,9 @@ class RAGAgent:
         except asyncio.TimeoutError as e:
             raise LLMServiceError() from e
 
-        chain = (
-            PromptTemplates.RESPOND_WITH_EVIDENCE_PROMPT
-            | llm.with_structured_output(QueryResponse)
+        # A JSON schema (rather than the model class) makes the parser emit partial dicts
+        chain = PromptTemplates.RESPOND_WITH_EVIDENCE_PROMPT | llm.with_structured_output(
+            QueryResponse.model_json_schema()
         )
 
         prompt_inputs = {
@@ -127,47 +244,180 @@ class RAGAgent:
         }
 
         try:
-            response: QueryResponse = await asyncio.wait_for(
-                chain.ainvoke(prompt_inputs), timeout=config.LLM_DEFAULT_TIMEOUT
-            )
+            async with scheduler.slot("llm"):
+                response: QueryResponse = await asyncio.wait_for(
+                    self._stream_query_response(chain, prompt_inputs),
+                    timeout=config.LLM_DEFAULT_TIMEOUT,
+                )
         except asyncio.TimeoutError as e:
             raise LLMServiceError() from e
 
         if response.is_evidence_based:
             return state.model_copy(
-                update={"messages": [AIMessage(content=response.response)]}
+                update={
+                    "messages": [AIMessage(content=response.response)],
+                    "is_evidence_based": True,
+                    "evidences": response.evidences,
+                }
             )
         else:
             return state.model_copy(
                 update={
                     "messages": [AIMessage(CONTEXT_NOT_AVAILABLE_ERROR_MESSAGE)],
                     "error": CONTEXT_NOT_AVAILABLE_ERROR_MESSAGE,
+                    "is_evidence_based": False,
                 }
             )
 
-    def _compile_graph(self):
+    def _answer_cache_model(self, state: RAGAgentState) -> str:
+        platform = state.config.llm_platform
+        return f"{platform}:{config.RESPONSE_GENERATOR_MODEL[platform]}"
+
+    async def _lookup_cached_answer(self, state: RAGAgentState) -> RAGAgentState:
+
+        # Follow-up questions depend on the conversation, only first questions are shared
+        if len(state.messages) > 1:
+            return state
+
+        async with scheduler.slot("embedding"):
+            query_embedding = await asyncio.to_thread(
+                embedding_engine.embed_query, state.input
+            )
+        cached = answer_cache.get(
+            state.active_documents_hash_list,
+            self._answer_cache_model(state),
+            query_embedding,
+        )
+        if not cached:
+            return state.model_copy(update={"query_embedding": query_embedding})
+        return state.model_copy(
+            update={
+                "messages": [AIMessage(content=cached.answer)],
+                "is_evidence_based": True,
+                "evidences": cached.evidences,
+                "answer_cache_hit": True,
+            }
+        )
+
+    def _is_answer_cached(self, state: RAGAgentState) -> bool:
+        return state.answer_cache_hit
+
+    async def _store_answer(self, state: RAGAgentState) -> RAGAgentState:
+
+        if not (state.query_embedding and state.is_evidence_based):
+            return state
+        # A document still being ingested would pin an answer from its first chunks
+        statuses = await async_repository.get_document_statuses(
+            state.active_documents_hash_list
+        )
+        if all(
+            statuses.get(document_hash_id) == DocumentStatus.READY
+            for document_hash_id in state.active_documents_hash_list
+        ):
+            answer_cache.put(
+                state.active_documents_hash_list,
+                self._answer_cache_model(state),
+                state.input,
+                state.query_embedding,
+                state.messages[-1].content,
+                state.evidences,
+            )
+        return state
+
+    def _variant(self, agent_config: AgentConfig) -> tuple:
+        # Feature flags that change the graph's shape
+        return (
+            agent_config.query_enrichment_enabled,
+            agent_config.answer_cache_enabled,
+            # Speculation only overlaps retrieval with enrichment
+            agent_config.query_enrichment_enabled
+            and agent_config.speculative_retrieval_enabled,
+        )
+
+    def _compile_graph(
+        self,
+        query_enrichment_enabled: bool,
+        answer_cache_enabled: bool,
+        speculative_retrieval_enabled: bool = False,
+    ) -> CompiledStateGraph:
 
         graph = StateGraph(RAGAgentState)
-        graph.add_node("enrich_query", self._enrich_query_for_retreival)
-        graph.add_node("get_context", self._get_context)
         graph.add_node("respond_to_user_query", self._respond_to_user_query)
         graph.add_node("no_context_error_handler", self._handle_no_context_error)
 
-        graph.set_entry_point("enrich_query")
-        graph.add_edge("enrich_query", "get_context")
+        if speculative_retrieval_enabled:
+            context_node = "enrich_and_get_context"
+            graph.add_node(context_node, self._enrich_and_get_context)
+            retrieval_entry = context_node
+        else:
+            context_node = "get_context"
+            graph.add_node(context_node, self._get_context)
+            retrieval_entry = context_node
+            if query_enrichment_enabled:
+                graph.add_node("enrich_query", self._enrich_query_for_retreival)
+                graph.add_edge("enrich_query", context_node)
+                retrieval_entry = "enrich_query"
+
+        if answer_cache_enabled:
+            graph.add_node("lookup_cached_answer", self._lookup_cached_answer)
+            graph.add_node("store_answer", self._store_answer)
+            graph.set_entry_point("lookup_cached_answer")
+            graph.add_conditional_edges(
+                "lookup_cached_answer",
+                self._is_answer_cached,
+                {True: END, False: retrieval_entry},
+            )
+            graph.add_edge("respond_to_user_query", "store_answer")
+            graph.add_edge("store_answer", END)
+        else:
+            graph.set_entry_point(retrieval_entry)
+            graph.add_edge("respond_to_user_query", END)
+
         graph.add_conditional_edges(
-            "get_context",
+            context_node,
             self._is_respondable,
             {True: "respond_to_user_query", False: "no_context_error_handler"},
         )
-        graph.add_edge("respond_to_user_query", END)
-        self.app = graph.compile()
-        print(self.app.get_graph().draw_ascii())
+        return graph.compile()
 
-    async def ainvoke(self, state: RAGAgentState) -> RAGAgentState:
+    def get_app(self, agent_config: AgentConfig) -> CompiledStateGraph:
+        variant = self._variant(agent_config)
+        app = self._apps.get(variant)
+        if app is None:
+            with self._apps_lock:
+                app = self._apps.get(variant)
+                if app is None:
+                    app = self._apps[variant] = self._compile_graph(*variant)
+        return app
+
+    def _prepare_state(self, state: RAGAgentState) -> RAGAgentState:
 
         if state.input.strip() == "":
             raise ValueError("Missing required attribute 'input' in state object")
 
         state.messages.append(HumanMessage(state.input))
-        return await self.app.ainvoke(state)
+        return state
+
+    async def ainvoke(self, state: RAGAgentState) -> RAGAgentState:
+        app = self.get_app(state.config)
+        return await app.ainvoke(self._prepare_state(state))
+
+    async def astream(self, state: RAGAgentState) -> AsyncIterator[dict]:
+        """
+        Yields {"type": "token", "content": ...} events while the response is
+        generated, then a single {"type": "final", "state": ...} event.
+        """
+
+        final_state = None
+        app = self.get_app(state.config)
+        async for mode, chunk in app.astream(
+            self._prepare_state(state), stream_mode=["custom", "values"]
+        ):
+            if mode == "custom":
+                yield chunk
+            else:
+                final_state = chunk
+        yield {"type": "final", "state": final_state}
+
+
+rag_agent = RAGAgent()
@@ -0,0 +1,143 @@
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from pdf_chatbot.errors.rag_agent_error import RerankerError
+from pdf_chatbot.model_registry import model_registry
+import queue
+import threading
+import time
+import pdf_chatbot.config as config
+
+
+def _load_cross_encoder(model_name: str):
+    # Imported here so importing the module doesn't pull in torch
+    from sentence_transformers import CrossEncoder
+
+    return CrossEncoder(model_name)
+
+
+class BatchedReranker:
+    """
+    Cross-encoder reranking service shared across concurrent requests.
+    Callers enqueue their (query, passage) pairs and block on a future; a
+    single worker thread flushes queued pairs as one batched predict call
+    once max_batch_size pairs are pending or max_wait_ms has elapsed.
+    Callers give up after timeout_seconds, and a worker that died is
+    restarted by the next call. The cross-encoder is loaded through the
+    model registry on first use.
+    """
+
+    def __init__(
+        self,
+        model_name: str = config.CROSS_ENCODER_MODEL,
+        max_batch_size: int = config.RERANKER_MAX_BATCH_SIZE,
+        max_wait_ms: float = config.RERANKER_MAX_WAIT_MS,
+        timeout_seconds: float = config.RERANKER_TIMEOUT_SECONDS,
+    ):
+        self.model_name = model_name
+        model_registry.register(
+            f"cross_encoder:{model_name}", lambda: _load_cross_encoder(model_name)
+        )
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_ms / 1000
+        self.timeout_seconds = timeout_seconds
+        self._requests: queue.Queue[tuple[list[tuple[str, str]], Future]] = (
+            queue.Queue()
+        )
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.pairs = 0
+        self.requests = 0
+        self.timeouts = 0
+        self.worker_restarts = 0
+        self._worker_lock = threading.Lock()
+        self._worker = self._start_worker()
+
+    def _start_worker(self) -> threading.Thread:
+        worker = threading.Thread(target=self._run, name="batched-reranker", daemon=True)
+        worker.start()
+        return worker
+
+    def _ensure_worker(self):
+        if self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if not self._worker.is_alive():
+                self._worker = self._start_worker()
+                with self._stats_lock:
+                    self.worker_restarts += 1
+
+    @property
+    def model(self):
+        return model_registry.get(f"cross_encoder:{self.model_name}")
+
+    def predict(self, pairs: list[tuple[str, str]]) -> list[float]:
+        if not pairs:
+            return []
+        self._ensure_worker()
+        future: Future = Future()
+        self._requests.put((list(pairs), future))
+        try:
+            return future.result(timeout=self.timeout_seconds)
+        except FutureTimeoutError as e:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise RerankerError() from e
+
+    def _collect_batch(self) -> list[tuple[list[tuple[str, str]], Future]]:
+        batch = [self._requests.get()]
+        pending_pairs = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait_seconds
+        while pending_pairs < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(request)
+            pending_pairs += len(request[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            try:
+                self._process_batch(batch)
+            except Exception as e:
+                # Keep the worker alive; only this batch's callers see the error
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _process_batch(self, batch: list[tuple[list[tuple[str, str]], Future]]):
+        all_pairs = [pair for pairs, _ in batch for pair in pairs]
+        scores = self.model.predict(all_pairs, batch_size=self.max_batch_size)
+
+        offset = 0
+        for pairs, future in batch:
+            future.set_result(
+                [float(score) for score in scores[offset : offset + len(pairs)]]
+            )
+            offset += len(pairs)
+
+        with self._stats_lock:
+            self.batches += 1
+            self.requests += len(batch)
+            self.pairs += len(all_pairs)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "batches": self.batches,
+                "requests": self.requests,
+                "pairs": self.pairs,
+                "avg_requests_per_batch": (
+                    self.requests / self.batches if self.batches else 0
+                ),
+                "queue_depth": self._requests.qsize(),
+                "timeouts": self.timeouts,
+                "worker_restarts": self.worker_restarts,
+            }
+
+
+reranker = BatchedReranker()
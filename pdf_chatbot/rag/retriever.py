@@ -1,65 +1,68 @@
 from langchain_core.documents import Document
 from langchain_classic.retrievers import EnsembleRetriever
-from langchain_community.retrievers import BM25Retriever
 from langchain_chroma import Chroma
-from langchain_huggingface import HuggingFaceEmbeddings
-from sentence_transformers import CrossEncoder
 from pdf_chatbot.rag.vector_store import VectorStore
+from pdf_chatbot.rag.lexical_index import LexicalIndex, LexicalRetriever
+from pdf_chatbot.rag.reranker import reranker
+from pdf_chatbot.rag.embeddings import embedding_engine
+from pdf_chatbot.db import repository
 import pdf_chatbot.config as config
 
 
-reranker = CrossEncoder(config.CROSS_ENCODER_MODEL)
-embedding_fn = HuggingFaceEmbeddings(model_name=config.VECTOR_EMBEDDING_MODEL)
-
-
 class ScopedHybridRetriever:
     """
-    Hybrid retriever scoped to a single metadata filter.
-    The filter must include user_id and document_hash_id.
+    Hybrid retriever scoped to the documents a single user owns.
+    Chunks are shared across users, so the scope is narrowed to the
+    requested documents that the user has ingested.
     A new instance must be created if scope changes.
     """
 
     def __init__(
         self,
-        metadata_filter: dict,
+        user_id: int,
+        document_hash_ids: list[str],
         max_k: int = config.VECTOR_RETRIEVER_MAX_DOCS,
     ):
 
-        self._validate_metadata_filter(metadata_filter)
+        self._validate_scope(user_id, document_hash_ids)
         self.k = max_k
-        self.metadata_filter = metadata_filter
+        self.user_id = user_id
+        self.document_hash_ids = repository.get_user_document_hashes(
+            user_id=user_id, document_hash_ids=list(document_hash_ids)
+        )
+        self.metadata_filter = {"document_hash_id": {"$in": self.document_hash_ids}}
         self.vector_store: VectorStore = VectorStore.get_instance()
-        self.retriever = self._get_hybrid_retriever(self.metadata_filter)
+        self.lexical_index: LexicalIndex = LexicalIndex.get_instance()
+        self.retriever = (
+            self._get_hybrid_retriever(self.metadata_filter)
+            if self.document_hash_ids
+            else None
+        )
 
-    def _validate_metadata_filter(self, metadata_filter: dict):
+    def _validate_scope(self, user_id: int, document_hash_ids: list[str]):
 
+        if user_id is None or type(user_id) != int:
+            raise ValueError("Missing or Invalid required parameter 'user_id'")
         if (
-            not metadata_filter
-            or type(metadata_filter) != dict
-            or len(metadata_filter.keys()) == 0
+            not document_hash_ids
+            or type(document_hash_ids) != list
+            or len(document_hash_ids) == 0
         ):
-            raise ValueError("Missing required field : metadata_filter")
-
-        if "user_id" not in str(metadata_filter):
-            raise ValueError("Missing required filter 'user_id' in metadata_filter")
-        if "document_hash_id" not in str(metadata_filter):
-            raise ValueError(
-                "Missing required filter 'document_hash_id' in metadata_filter"
-            )
-
-    def _get_bm25_retriever(self, chunks: list[str]):
-        if not chunks or type(chunks) != list or len(chunks) == 0:
-            chunks = ["dummy chunk"]
-        bm25_retriever = BM25Retriever.from_texts(chunks)
-        bm25_retriever.k = self.k
-        return bm25_retriever
+            raise ValueError("Missing required parameter 'document_hash_ids'")
+
+    def _get_lexical_retriever(self):
+        return LexicalRetriever(
+            index=self.lexical_index,
+            document_hash_ids=self.document_hash_ids,
+            k=self.k,
+        )
 
     def _get_semantic_retriever(self, metadata_filter: dict | None = None):
 
         chroma_store = Chroma(
             client=self.vector_store.db_client,
             collection_name=self.vector_store.collection_name,
-            embedding_function=embedding_fn,
+            embedding_function=embedding_engine,
         )
 
         retriever_args = {"k": self.k}
@@ -72,22 +75,30 @@ class ScopedHybridRetriever:
     def _get_hybrid_retriever(self, metadata_filter: dict):
 
         vector_retriever = self._get_semantic_retriever(metadata_filter=metadata_filter)
-        bm25_retriever = self._get_bm25_retriever(
-            chunks=self.vector_store.get_document_chunks(metadata_filter)
-        )
+        lexical_retriever = self._get_lexical_retriever()
 
         return EnsembleRetriever(
-            retrievers=[vector_retriever, bm25_retriever], weights=[0.6, 0.4]
+            retrievers=[vector_retriever, lexical_retriever], weights=[0.6, 0.4]
         )
 
+    def retrieve_candidates(self, query: str) -> list[Document]:
+        """Hybrid search results for the query, before reranking."""
+        if not self.retriever:
+            return []
+        return self.retriever.invoke(input=query)
+
     def query_docs(self, query: str, k: int = 3) -> list[Document]:
-        docs = self.retriever.invoke(input=query)
-        scores = reranker.predict([(query, doc.page_content) for doc in docs])
-        scored_docs = list(zip(docs, scores))
-        scored_docs.sort(key=lambda x: x[1], reverse=True)
-        relevent_docs = [
-            doc
-            for doc, score in scored_docs
-            if score >= config.CROSS_ENCODER_RELEVANCE_THRUSHOLD
-        ]
-        return relevent_docs[:k]
+        return rerank(query, self.retrieve_candidates(query), k)
+
+
+def rerank(query: str, docs: list[Document], k: int = 3) -> list[Document]:
+    """Top k docs by cross-encoder score, dropping those below the relevance threshold."""
+    scores = reranker.predict([(query, doc.page_content) for doc in docs])
+    scored_docs = list(zip(docs, scores))
+    scored_docs.sort(key=lambda x: x[1], reverse=True)
+    relevent_docs = [
+        doc
+        for doc, score in scored_docs
+        if score >= config.CROSS_ENCODER_RELEVANCE_THRUSHOLD
+    ]
+    return relevent_docs[:k]
@@ -0,0 +1,81 @@
+from collections import OrderedDict
+import threading
+import time
+from pdf_chatbot.rag.retriever import ScopedHybridRetriever
+import pdf_chatbot.config as config
+
+
+class RetrieverCache:
+    """
+    Bounded, thread-safe LRU cache of ScopedHybridRetriever instances keyed
+    by (user_id, frozenset(document_hash_ids)). Entries expire after a TTL
+    and can be invalidated explicitly when a scope's chunks change.
+    """
+
+    def __init__(
+        self,
+        max_size: int = config.RETRIEVER_CACHE_MAX_SIZE,
+        ttl_seconds: float = config.RETRIEVER_CACHE_TTL_SECONDS,
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[tuple, tuple[float, ScopedHybridRetriever]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int, document_hash_ids: list[str]) -> ScopedHybridRetriever:
+
+        key = (user_id, frozenset(document_hash_ids))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now - entry[0] < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self._entries.pop(key, None)
+            self.misses += 1
+
+        # Build outside the lock so a slow build doesn't block other scopes
+        retriever = ScopedHybridRetriever(
+            user_id=user_id, document_hash_ids=list(document_hash_ids)
+        )
+
+        with self._lock:
+            self._entries[key] = (now, retriever)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return retriever
+
+    def invalidate(self, user_id: int, document_hash_id: str | None = None) -> int:
+        """Drop every cached scope of a user, or only those containing a document."""
+        with self._lock:
+            stale_keys = [
+                key
+                for key in self._entries
+                if key[0] == user_id
+                and (document_hash_id is None or document_hash_id in key[1])
+            ]
+            for key in stale_keys:
+                del self._entries[key]
+        return len(stale_keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+retriever_cache = RetrieverCache()
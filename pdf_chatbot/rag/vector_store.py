@@ -1,14 +1,13 @@
 from chromadb import PersistentClient
-from chromadb.utils import embedding_functions
+from chromadb.errors import NotFoundError
 from typing import Sequence
 import dotenv
 import pdf_chatbot.config as config
 from langchain_core.documents import Document
+from pdf_chatbot.rag.embeddings import embedding_engine
+import threading
 
 dotenv.load_dotenv()
-embedding_fn = embedding_functions.SentenceTransformerEmbeddingFunction(
-    model_name=config.VECTOR_EMBEDDING_MODEL
-)
 
 
 class VectorStore:
@@ -33,16 +32,38 @@ class VectorStore:
 
         self.db_client = PersistentClient(path=config.DEFAULT_VECTOR_DB_PATH)
         self.collection_name = collection_name.strip()
-        self.embedding_function = embedding_fn
-        self.collection = self.db_client.get_or_create_collection(
-            self.collection_name,
-            embedding_function=self.embedding_function,
-        )
+        self._collection = None
+        self._collection_lock = threading.Lock()
+
+    @property
+    def collection(self):
+        # Opened on first use, as binding the embedding function loads the model
+        if self._collection is None:
+            with self._collection_lock:
+                if self._collection is None:
+                    self._collection = self.db_client.get_or_create_collection(
+                        self.collection_name,
+                        embedding_function=embedding_engine.embedding_function,
+                    )
+        return self._collection
+
+    def get_raw_collection(self):
+        """
+        The collection without an embedding function, for maintenance that
+        only moves stored embeddings (no model load). None if it doesn't exist.
+        """
+        try:
+            return self.db_client.get_collection(
+                self.collection_name, embedding_function=None
+            )
+        except NotFoundError:
+            return None
 
     def add(
         self, ids: Sequence[str], chunks: Sequence[str], metadatas: Sequence[dict]
     ) -> None:
-        self.collection.add(ids=ids, documents=chunks, metadatas=metadatas)
+        # Upsert keeps concurrent ingestion of the same shared document idempotent
+        self.collection.upsert(ids=ids, documents=chunks, metadatas=metadatas)
 
     def fetch_similar_docs(
         self, query: str, limit: int = config.VECTOR_RETRIEVER_MAX_DOCS
@@ -54,6 +75,7 @@ class VectorStore:
         results = self.collection.get(where=metadata_filter)
         return len(results["documents"]) > 0
 
-    def get_document_chunks(self, metadata_filter: dict) -> list[str]:
-        results = self.collection.get(where=metadata_filter)
-        return results["documents"]
+    def get_document_records(self, metadata_filter: dict) -> tuple[list[str], list[str]]:
+        results = self.collection.get(where=metadata_filter, include=["metadatas", "documents"])
+        chunk_ids = [metadata["chunk_id"] for metadata in results["metadatas"]]
+        return chunk_ids, results["documents"]
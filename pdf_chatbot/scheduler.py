@@ -0,0 +1,156 @@
+from collections import deque
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import AsyncIterator
+from pdf_chatbot.errors.scheduler_error import (
+    CapacityExceededError,
+    CapacityTimeoutError,
+)
+from pdf_chatbot import config
+import itertools
+import asyncio
+import heapq
+import time
+
+
+class Priority(IntEnum):
+    # Lower runs first
+    INTERACTIVE = 0
+    BULK = 1
+
+
+class _CapacityPool:
+    """
+    At most `capacity` holders at once; waiters are served by priority,
+    then arrival order. A released slot is handed straight to the next
+    waiter so later arrivals cannot overtake the queue.
+    """
+
+    def __init__(self, name: str, capacity: int, max_queue: int):
+        self.name = name
+        self.capacity = capacity
+        self.max_queue = max_queue
+        self.active = 0
+        self.queued = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._arrivals = itertools.count()
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._wait_seconds: deque[float] = deque(maxlen=1024)
+
+    def is_full(self) -> bool:
+        return self.queued >= self.max_queue
+
+    async def acquire(self, priority: Priority, max_wait_seconds: float | None):
+        start = time.perf_counter()
+        if self.active < self.capacity and not self.queued:
+            self.active += 1
+        else:
+            await self._wait(priority, max_wait_seconds)
+        self.admitted += 1
+        self._wait_seconds.append(time.perf_counter() - start)
+
+    async def _wait(self, priority: Priority, max_wait_seconds: float | None):
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._arrivals), future))
+        self.queued += 1
+        try:
+            await asyncio.wait_for(future, max_wait_seconds)
+        except BaseException as e:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as we gave up
+                self.release()
+            else:
+                future.cancel()
+                self.queued -= 1
+            if isinstance(e, asyncio.TimeoutError):
+                self.timed_out += 1
+                raise CapacityTimeoutError(
+                    f"Timed out waiting for {self.name} capacity. Please retry shortly"
+                ) from e
+            raise
+
+    def release(self):
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            # Waiters that gave up are left in the heap and skipped here
+            if future.done():
+                continue
+            self.queued -= 1
+            future.set_result(None)
+            return
+        self.active -= 1
+
+    def stats(self) -> dict:
+        wait_seconds = sorted(self._wait_seconds)
+
+        def percentile(p: float) -> float | None:
+            if not wait_seconds:
+                return None
+            return wait_seconds[min(int(len(wait_seconds) * p), len(wait_seconds) - 1)]
+
+        return {
+            "capacity": self.capacity,
+            "active": self.active,
+            "queued": self.queued,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "wait_p50_seconds": percentile(0.5),
+            "wait_p95_seconds": percentile(0.95),
+            "wait_max_seconds": wait_seconds[-1] if wait_seconds else None,
+        }
+
+
+class _Scheduler:
+    """
+    Process-wide admission control for expensive work. Each kind of work
+    (conversion, embedding, reranking, llm) has its own capacity pool, so
+    a flood of uploads cannot take the slots chat requests need, and
+    interactive work is queued ahead of bulk ingestion.
+    Interactive callers are rejected when the queue is full and give up
+    after max_wait_seconds. Bulk work is checked once on submission with
+    ensure_capacity() and then waits its turn, so a document is never
+    dropped halfway through ingestion.
+    """
+
+    def __init__(
+        self,
+        pools: dict[str, dict] = config.SCHEDULER_POOLS,
+        max_wait_seconds: float = config.SCHEDULER_MAX_WAIT_SECONDS,
+    ):
+        self.pools = {
+            name: _CapacityPool(name, **limits) for name, limits in pools.items()
+        }
+        self.max_wait_seconds = max_wait_seconds
+
+    def ensure_capacity(self, pool_name: str):
+        pool = self.pools[pool_name]
+        if pool.is_full():
+            pool.rejected += 1
+            raise CapacityExceededError(
+                f"Too many pending {pool_name} requests. Please retry shortly"
+            )
+
+    @asynccontextmanager
+    async def slot(
+        self, pool_name: str, priority: Priority = Priority.INTERACTIVE
+    ) -> AsyncIterator[None]:
+        pool = self.pools[pool_name]
+        max_wait_seconds = None
+        if priority == Priority.INTERACTIVE:
+            self.ensure_capacity(pool_name)
+            max_wait_seconds = self.max_wait_seconds
+        await pool.acquire(priority, max_wait_seconds)
+        try:
+            yield
+        finally:
+            pool.release()
+
+    def stats(self) -> dict:
+        return {name: pool.stats() for name, pool in self.pools.items()}
+
+
+scheduler = _Scheduler()
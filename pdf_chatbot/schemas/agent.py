@@ -9,6 +9,8 @@ from pdf_chatbot import config
 class AgentConfig(BaseModel):
     llm_platform: str = config.DEFAULT_LLM_PLATFORM
     query_enrichment_enabled: bool = config.QUERY_ENRICHMENT_FEATURE_ENABLED
+    answer_cache_enabled: bool = config.ANSWER_CACHE_FEATURE_ENABLED
+    speculative_retrieval_enabled: bool = config.SPECULATIVE_RETRIEVAL_FEATURE_ENABLED
 
 
 class RAGAgentState(BaseModel):
@@ -17,6 +19,11 @@ class RAGAgentState(BaseModel):
     input: str
     messages: Annotated[list[BaseMessage], add_messages] = Field(default_factory=list)
     enriched_query: str | None = None
+    # Set only when the answer cache applies (first question of a conversation)
+    query_embedding: list[float] | None = None
+    answer_cache_hit: bool = False
     active_documents_hash_list: list[str]
     context: str | None = None
+    is_evidence_based: bool | None = None
+    evidences: list[str] = Field(default_factory=list)
     error: str | None = None
@@ -10,10 +10,19 @@ class File(BaseModel):
     file_content_base64: str
 
 
+class ChatResponseMode(str, Enum):
+    # Full returns the whole conversation, delta only the new assistant message
+    FULL = "full"
+    DELTA = "delta"
+
+
 class ChatRequest(BaseModel):
     agent_config: AgentConfig = AgentConfig()
     message: str
-    files: list[File]
+    files: list[File] = []
+    # None keeps the session's active documents, [] clears them
+    document_hash_ids: list[str] | None = None
+    response_mode: ChatResponseMode = ChatResponseMode.FULL
 
 
 class Role(str, Enum):
@@ -22,14 +31,30 @@ class Role(str, Enum):
 
 
 class ChatMessage(BaseModel):
+    id: str | None = None
     role: Role
     content: str
 
 
 class AssistantResponse(BaseModel):
+    id: str | None = None
     content: str
 
 
+def _to_chat_messages(messages: list[BaseMessage]) -> list[ChatMessage]:
+    chat_message_list: list[ChatMessage] = []
+    for message in messages:
+        if message.type == "human":
+            chat_message_list.append(
+                ChatMessage(id=message.id, role=Role.USER, content=message.content)
+            )
+        elif message.type == "ai":
+            chat_message_list.append(
+                ChatMessage(id=message.id, role=Role.ASSISTANT, content=message.content)
+            )
+    return chat_message_list
+
+
 class ChatData(BaseModel):
     assistant_response: AssistantResponse
     chat_history: list[ChatMessage]
@@ -41,38 +66,89 @@ class ChatResponse(BaseModel):
 
     @classmethod
     def from_data(cls, chat_thread: list[BaseMessage]) -> "ChatResponse":
-        assistant_response = AssistantResponse(content=chat_thread[-1].content)
-        chat_message_list: list[ChatMessage] = []
-        for message in chat_thread[:-1]:
-            if message.type == "human":
-                chat_message_list.append(
-                    ChatMessage(role=Role.USER, content=message.content)
-                )
-            elif message.type == "ai":
-                chat_message_list.append(
-                    ChatMessage(role=Role.ASSISTANT, content=message.content)
-                )
+        assistant_response = AssistantResponse(
+            id=chat_thread[-1].id, content=chat_thread[-1].content
+        )
         return cls(
             data=ChatData(
-                assistant_response=assistant_response, chat_history=chat_message_list
+                assistant_response=assistant_response,
+                chat_history=_to_chat_messages(chat_thread[:-1]),
+            )
+        )
+
+
+class ChatDeltaData(BaseModel):
+    assistant_response: AssistantResponse
+    # Newest message id; pass as 'after' to /chat/history to fetch later messages
+    history_cursor: str
+
+
+class ChatDeltaResponse(BaseModel):
+    status: APIStatus = APIStatus.SUCCESS
+    data: ChatDeltaData
+
+    @classmethod
+    def from_data(cls, chat_thread: list[BaseMessage]) -> "ChatDeltaResponse":
+        return cls(
+            data=ChatDeltaData(
+                assistant_response=AssistantResponse(
+                    id=chat_thread[-1].id, content=chat_thread[-1].content
+                ),
+                history_cursor=chat_thread[-1].id,
             )
         )
 
 
+class ChatStreamToken(BaseModel):
+    content: str
+
+
+class ChatStreamDoneData(BaseModel):
+    assistant_response: AssistantResponse
+    is_evidence_based: bool | None = None
+    evidences: list[str] = []
+
+
+class ChatStreamDone(BaseModel):
+    status: APIStatus = APIStatus.SUCCESS
+    data: ChatStreamDoneData
+
+    @classmethod
+    def from_data(
+        cls,
+        chat_thread: list[BaseMessage],
+        is_evidence_based: bool | None,
+        evidences: list[str],
+    ) -> "ChatStreamDone":
+        return cls(
+            data=ChatStreamDoneData(
+                assistant_response=AssistantResponse(
+                    id=chat_thread[-1].id, content=chat_thread[-1].content
+                ),
+                is_evidence_based=is_evidence_based,
+                evidences=evidences,
+            )
+        )
+
+
+class ChatHistoryPage(BaseModel):
+    # Pass back with the same direction ('before' or 'after') for the next page
+    next_cursor: str | None = None
+    has_more: bool = False
+
+
 class ChatHistoryResponse(BaseModel):
     status: APIStatus = APIStatus.SUCCESS
     data: list[ChatMessage]
+    page: ChatHistoryPage = ChatHistoryPage()
 
     @classmethod
-    def from_data(cls, chat_history: list[BaseMessage]) -> "ChatHistoryResponse":
-        chat_message_list: list[ChatMessage] = []
-        for message in chat_history:
-            if message.type == "human":
-                chat_message_list.append(
-                    ChatMessage(role=Role.USER, content=message.content)
-                )
-            elif message.type == "ai":
-                chat_message_list.append(
-                    ChatMessage(role=Role.ASSISTANT, content=message.content)
-                )
-        return cls(data=chat_message_list)
+    def from_data(
+        cls, chat_history: list[BaseMessage], next_cursor: str | None = None
+    ) -> "ChatHistoryResponse":
+        return cls(
+            data=_to_chat_messages(chat_history),
+            page=ChatHistoryPage(
+                next_cursor=next_cursor, has_more=next_cursor is not None
+            ),
+        )
@@ -0,0 +1,53 @@
+from pydantic import BaseModel
+from enum import Enum
+from datetime import datetime
+from pdf_chatbot.schemas.common import APIStatus
+
+
+class DocumentStatus(str, Enum):
+    PROCESSING = "PROCESSING"
+    READY = "READY"
+    FAILED = "FAILED"
+
+
+class IngestionJobStatus(str, Enum):
+    QUEUED = "QUEUED"
+    PROCESSING = "PROCESSING"
+    READY = "READY"
+    FAILED = "FAILED"
+
+
+class IngestionJob(BaseModel):
+    job_id: str
+    user_id: int
+    document_hash_id: str
+    file_name: str | None = None
+    status: IngestionJobStatus = IngestionJobStatus.QUEUED
+    error: str | None = None
+    created_at: datetime
+    updated_at: datetime
+
+
+class IngestionJobData(BaseModel):
+    job_id: str
+    document_hash_id: str
+    file_name: str | None = None
+    status: IngestionJobStatus
+    error: str | None = None
+
+
+class IngestionJobResponse(BaseModel):
+    status: APIStatus = APIStatus.SUCCESS
+    data: IngestionJobData
+
+    @classmethod
+    def from_data(cls, job: IngestionJob) -> "IngestionJobResponse":
+        return cls(
+            data=IngestionJobData(
+                job_id=job.job_id,
+                document_hash_id=job.document_hash_id,
+                file_name=job.file_name,
+                status=job.status,
+                error=job.error,
+            )
+        )
@@ -0,0 +1,42 @@
+from pydantic import BaseModel
+from pdf_chatbot.schemas.common import APIStatus
+from pdf_chatbot.model_registry import ComponentState
+
+
+class HealthResponse(BaseModel):
+    status: APIStatus = APIStatus.SUCCESS
+
+
+class ComponentStatus(BaseModel):
+    state: ComponentState
+    load_seconds: float | None = None
+    error: str | None = None
+
+
+class ReadinessData(BaseModel):
+    ready: bool
+    warmup_seconds: float | None = None
+    components: dict[str, ComponentStatus]
+
+
+class ReadinessResponse(BaseModel):
+    status: APIStatus = APIStatus.SUCCESS
+    data: ReadinessData
+
+    @classmethod
+    def from_data(
+        cls, ready: bool, warmup_seconds: float | None, components: dict[str, dict]
+    ) -> "ReadinessResponse":
+        return cls(
+            status=APIStatus.SUCCESS if ready else APIStatus.ERROR,
+            data=ReadinessData(
+                ready=ready, warmup_seconds=warmup_seconds, components=components
+            ),
+        )
+
+
+class MetricsResponse(BaseModel):
+    """Runtime counters of the shared pools and stores, keyed by component."""
+
+    status: APIStatus = APIStatus.SUCCESS
+    data: dict[str, dict]
@@ -0,0 +1,140 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from passlib.context import CryptContext
+from pdf_chatbot.errors.auth_error import AuthError, PasswordHasherOverloadedError
+from pdf_chatbot.model_registry import model_registry
+from pdf_chatbot import config
+import multiprocessing
+import threading
+import asyncio
+import time
+import os
+
+
+pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def verify_password(password: str, password_hash: str) -> bool:
+    return pwd_context.verify(password, password_hash)
+
+
+def _warm_worker() -> int:
+    return os.getpid()
+
+
+class PasswordHasher:
+    """
+    Bounded process pool for argon2 hashing and verification. argon2 is
+    CPU and memory hard by design, so running it in request threads lets
+    a burst of logins starve every other endpoint. At most
+    max_workers + max_pending operations are admitted; beyond that callers
+    get PasswordHasherOverloadedError at once rather than waiting in line.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = config.PASSWORD_HASH_WORKERS,
+        max_pending: int = config.PASSWORD_HASH_MAX_PENDING,
+    ):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: ProcessPoolExecutor | None = None
+        self._executor_lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.failed = 0
+        # Seconds from admission to result, including time queued for a worker
+        self._latencies: deque[float] = deque(maxlen=1024)
+
+    def start(self) -> ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def warmup(self) -> "PasswordHasher":
+        # Spawning workers takes longer than a hash; keep it off the first login
+        executor = self.start()
+        futures = [executor.submit(_warm_worker) for _ in range(self.max_workers)]
+        wait(futures)
+        for future in futures:
+            future.result()
+        return self
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        return await self._run(verify_password, password, password_hash)
+
+    async def _run(self, fn, *args):
+        # Single event loop: check and increment happen without an await in between
+        if self.in_flight >= self.max_workers + self.max_pending:
+            self.rejected += 1
+            raise PasswordHasherOverloadedError(
+                "Too many concurrent sign-ins. Please retry shortly"
+            )
+        self.in_flight += 1
+        start = time.perf_counter()
+        executor = self.start()
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(
+                executor, fn, *args
+            )
+        except BrokenProcessPool as e:
+            self.failed += 1
+            self._discard_executor(executor)
+            raise AuthError("Password hashing worker crashed. Please retry") from e
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+        self._latencies.append(time.perf_counter() - start)
+        self.completed += 1
+        return result
+
+    def _discard_executor(self, executor: ProcessPoolExecutor) -> None:
+        with self._executor_lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> dict:
+        latencies = sorted(self._latencies)
+
+        def percentile(p: float) -> float | None:
+            if not latencies:
+                return None
+            return latencies[min(int(len(latencies) * p), len(latencies) - 1)]
+
+        return {
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "failed": self.failed,
+            "latency_p50_seconds": percentile(0.5),
+            "latency_p95_seconds": percentile(0.95),
+            "latency_max_seconds": latencies[-1] if latencies else None,
+        }
+
+
+password_hasher = PasswordHasher()
+model_registry.register("password_hasher", password_hasher.warmup)
@@ -1,64 +1,96 @@
-from pdf_chatbot.db import repository
-from langchain_core.messages import messages_from_dict, messages_to_dict
-from datetime import datetime
-import json
+from pdf_chatbot.chat.history import load_recent_messages
+from pdf_chatbot.db.async_repository import run_in_db_thread
+from pdf_chatbot.user.session_store import SessionStore, create_session_store
+from pdf_chatbot import config
+from datetime import datetime, timedelta
+import asyncio
 import uuid
 
 
 class _SessionManager:
+    """
+    Creates, expires and persists user sessions on top of a SessionStore.
+    Sessions idle for longer than idle_ttl_seconds are evicted, either on
+    access or by the background sweeper. Chat history is written to the
+    chat_messages table every turn, so sessions only hold the recent
+    window and can be dropped at any time.
+    """
 
-    def __init__(self):
-        self.sessions = {}
-        self.sessions_by_user_id = {}
+    def __init__(
+        self,
+        store: SessionStore | None = None,
+        idle_ttl_seconds: int = config.SESSION_IDLE_TTL_SECONDS,
+    ):
+        self.store = store or create_session_store()
+        self.idle_ttl = timedelta(seconds=idle_ttl_seconds)
 
-    def get_session(self, session_id: str) -> dict:
-        return self.sessions.get(session_id)
+    def get_session(self, session_id: str) -> dict | None:
+        session = self.store.get(session_id)
+        if not session:
+            return None
+        now = datetime.now()
+        if now - session["last_active_at"] > self.idle_ttl:
+            self.delete_session(session_id)
+            return None
+        session["last_active_at"] = now
+        self.store.touch(session)
+        return session
 
-    def get_session_id(self, user_id: int) -> str:
-        return self.sessions_by_user_id.get(user_id)
+    async def aget_session(self, session_id: str) -> dict | None:
+        """
+        get_session for the event loop. In-process stores are read inline,
+        so authenticating a request never waits for a worker thread.
+        """
+        if not self.store.blocking:
+            return self.get_session(session_id)
+        return await run_in_db_thread(self.get_session, session_id)
 
-    def getsessions_by_user_id(self, user_id: int) -> dict:
-        session_id = self.sessions_by_user_id.get(user_id)
-        return self.sessions.get(session_id) if session_id else None
+    def save_session(self, session: dict) -> None:
+        """Persists changes made to a session (chat history, active documents)."""
+        session["last_active_at"] = datetime.now()
+        self.store.put(session)
 
-    def create_session(
-        self, user_id: int, chat_history_file_path: str | None = None
-    ) -> dict:
+    def create_session(self, user_id: int) -> str:
 
-        if self.sessions_by_user_id.get(user_id) and self.sessions.get(
-            self.sessions_by_user_id[user_id]
-        ):
-            self.delete_session(self.sessions_by_user_id[user_id])
-
-        if not chat_history_file_path:
-            chat_history_file_path = repository.get_user_chat_history(user_id=user_id)
-
-        chat_history_dict = []
-        with open(chat_history_file_path, "r") as chat_file:
-            chat_history_dict = json.load(chat_file)
-        chat_history = messages_from_dict(chat_history_dict)
+        for session_id in self.store.get_user_session_ids(user_id):
+            self.delete_session(session_id)
 
+        chat_history = load_recent_messages(user_id)
         session_id = str(uuid.uuid4())
         current_session = {
+            "session_id": session_id,
             "user_id": user_id,
             "chat_history": chat_history,
-            "chat_history_file_path": chat_history_file_path,
+            # Leading messages of chat_history already in chat_messages
+            "persisted_message_count": len(chat_history),
             "active_docs": [],
             "created_at": datetime.now(),
             "last_active_at": datetime.now(),
         }
-        self.sessions[session_id] = current_session
-        self.sessions_by_user_id[user_id] = session_id
+        self.save_session(current_session)
         return session_id
 
     def delete_session(self, session_id: str):
-        current_session = self.sessions.get(session_id)
-        if current_session:
-            chat_history_dict = messages_to_dict(current_session["chat_history"])
-            with open(current_session["chat_history_file_path"], "w") as chat_file:
-                json.dump(chat_history_dict, chat_file, indent=2)
-            self.sessions.pop(session_id, None)
-            self.sessions_by_user_id.pop(current_session.get("user_id"), None)
+        self.store.delete(session_id)
+
+    def sweep_idle_sessions(self) -> int:
+        return len(self.store.pop_idle(datetime.now() - self.idle_ttl))
+
+    async def run_sweeper(
+        self, interval_seconds: int = config.SESSION_SWEEP_INTERVAL_SECONDS
+    ):
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                evicted = await asyncio.to_thread(self.sweep_idle_sessions)
+            except Exception as e:
+                print(f"Session sweep failed: {e!r}")
+                continue
+            if evicted:
+                print(f"Evicted {evicted} idle sessions")
+
+    def stats(self) -> dict:
+        return self.store.stats()
 
 
 session_manager = _SessionManager()
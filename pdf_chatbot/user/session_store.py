@@ -0,0 +1,168 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from langchain_core.messages import messages_from_dict, messages_to_dict
+from pdf_chatbot.db import repository
+from pdf_chatbot import config
+import threading
+import json
+
+
+class SessionStore(ABC):
+    """
+    Storage for session dicts keyed by session id. Stores only hold
+    sessions; the expiry policy belongs to the session manager. Methods
+    that remove sessions return the removed sessions.
+    """
+
+    # False when every call is a quick in-process lookup that may run on the event loop
+    blocking: bool = True
+
+    @abstractmethod
+    def get(self, session_id: str) -> dict | None: ...
+
+    @abstractmethod
+    def put(self, session: dict) -> list[dict]:
+        """Saves the session; returns sessions evicted to make room."""
+
+    @abstractmethod
+    def touch(self, session: dict) -> None: ...
+
+    @abstractmethod
+    def delete(self, session_id: str) -> dict | None: ...
+
+    @abstractmethod
+    def get_user_session_ids(self, user_id: int) -> list[str]: ...
+
+    @abstractmethod
+    def pop_idle(self, last_active_before: datetime) -> list[dict]: ...
+
+    @abstractmethod
+    def stats(self) -> dict: ...
+
+
+class InMemorySessionStore(SessionStore):
+    """Process-local LRU of sessions; evicts the least recently used beyond max_size."""
+
+    blocking = False
+
+    def __init__(self, max_size: int = config.SESSION_MAX_IN_MEMORY):
+        self.max_size = max_size
+        self.sessions: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, session_id: str) -> dict | None:
+        with self._lock:
+            session = self.sessions.get(session_id)
+            if session is not None:
+                self.sessions.move_to_end(session_id)
+            return session
+
+    def put(self, session: dict) -> list[dict]:
+        with self._lock:
+            self.sessions[session["session_id"]] = session
+            self.sessions.move_to_end(session["session_id"])
+            evicted = []
+            while len(self.sessions) > self.max_size:
+                evicted.append(self.sessions.popitem(last=False)[1])
+            self.evictions += len(evicted)
+            return evicted
+
+    def touch(self, session: dict) -> None:
+        # Sessions are shared by reference, the manager already updated it
+        pass
+
+    def delete(self, session_id: str) -> dict | None:
+        with self._lock:
+            return self.sessions.pop(session_id, None)
+
+    def get_user_session_ids(self, user_id: int) -> list[str]:
+        with self._lock:
+            return [
+                session_id
+                for session_id, session in self.sessions.items()
+                if session["user_id"] == user_id
+            ]
+
+    def pop_idle(self, last_active_before: datetime) -> list[dict]:
+        with self._lock:
+            idle_session_ids = [
+                session_id
+                for session_id, session in self.sessions.items()
+                if session["last_active_at"] < last_active_before
+            ]
+            return [self.sessions.pop(session_id) for session_id in idle_session_ids]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"sessions": len(self.sessions), "evictions": self.evictions}
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Sessions kept in the relational database, so every API worker process
+    sees the same sessions. Each read deserializes the stored session.
+    """
+
+    def _serialize(self, session: dict) -> str:
+        return json.dumps(
+            {
+                **session,
+                "chat_history": messages_to_dict(session["chat_history"]),
+                "created_at": session["created_at"].isoformat(),
+                "last_active_at": session["last_active_at"].isoformat(),
+            }
+        )
+
+    def _deserialize(self, data: str) -> dict:
+        session = json.loads(data)
+        session["chat_history"] = messages_from_dict(session["chat_history"])
+        session["created_at"] = datetime.fromisoformat(session["created_at"])
+        session["last_active_at"] = datetime.fromisoformat(session["last_active_at"])
+        return session
+
+    def get(self, session_id: str) -> dict | None:
+        data = repository.get_session(session_id)
+        return self._deserialize(data) if data else None
+
+    def put(self, session: dict) -> list[dict]:
+        repository.upsert_session(
+            session["session_id"],
+            session["user_id"],
+            self._serialize(session),
+            session["last_active_at"].timestamp(),
+        )
+        return []
+
+    def touch(self, session: dict) -> None:
+        repository.touch_session(
+            session["session_id"], session["last_active_at"].timestamp()
+        )
+
+    def delete(self, session_id: str) -> dict | None:
+        data = repository.delete_session(session_id)
+        return self._deserialize(data) if data else None
+
+    def get_user_session_ids(self, user_id: int) -> list[str]:
+        return repository.get_user_session_ids(user_id)
+
+    def pop_idle(self, last_active_before: datetime) -> list[dict]:
+        idle_sessions = []
+        for session_id in repository.get_idle_session_ids(last_active_before.timestamp()):
+            # Another worker may have claimed it in between
+            session = self.delete(session_id)
+            if session:
+                idle_sessions.append(session)
+        return idle_sessions
+
+    def stats(self) -> dict:
+        return {"sessions": repository.count_sessions()}
+
+
+def create_session_store(kind: str = config.SESSION_STORE) -> SessionStore:
+    if kind == "memory":
+        return InMemorySessionStore()
+    if kind == "sqlite":
+        return SQLiteSessionStore()
+    raise ValueError(f"Unsupported session store '{kind}'. Use 'memory' or 'sqlite'")